@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = float(os.getenv("API_CACHE_TTL_SECONDS", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "512"))
+# How long a looked-up warehouse version is trusted before asking Postgres again.
+VERSION_CHECK_SECONDS = float(os.getenv("API_CACHE_VERSION_CHECK_SECONDS", "5"))
+CACHE_REDIS_URL = os.getenv("API_CACHE_REDIS_URL")
+CACHED_PREFIXES = ("/reports", "/channels")
+
+CachedResponse = Tuple[int, str, bytes]
+
+
+class TTLCache:
+    """Thread-safe in-process LRU with a per-entry time to live.
+
+    get/set are coroutines only to share RedisCache's interface; they never wait.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: CachedResponse) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class RedisCache:
+    """Shared backend so several API workers reuse one set of cached responses."""
+
+    def __init__(self, url: str, ttl: float = CACHE_TTL_SECONDS):
+        import redis.asyncio as redis
+
+        self.ttl = int(ttl)
+        self._client = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            raw = await self._client.get(f"api-cache:{key}")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Redis cache unavailable: %s", exc)
+            return None
+        if raw is None:
+            return None
+        meta, body = raw.split(b"\n", 1)
+        status, media_type = json.loads(meta)
+        return status, media_type, body
+
+    async def set(self, key: str, value: CachedResponse) -> None:
+        status, media_type, body = value
+        payload = json.dumps([status, media_type]).encode() + b"\n" + body
+        try:
+            await self._client.set(f"api-cache:{key}", payload, ex=self.ttl)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Redis cache unavailable: %s", exc)
+
+
+def make_backend():
+    if CACHE_REDIS_URL:
+        try:
+            return RedisCache(CACHE_REDIS_URL)
+        except ImportError:
+            logger.warning("API_CACHE_REDIS_URL is set but redis is not installed; using in-process cache")
+    return TTLCache()
+
+
+class WarehouseVersion:
+    """Latest row of ops.warehouse_version, written by dbt at the end of each successful run."""
+
+    def __init__(self, check_seconds: float = VERSION_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._value: Tuple[str, Optional[datetime]] = ("none", None)
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def current(self) -> Tuple[str, Optional[datetime]]:
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.check_seconds:
+                return self._value
+            self._value = await self._fetch()
+            self._checked_at = time.monotonic()
+            return self._value
+
+    async def _fetch(self) -> Tuple[str, Optional[datetime]]:
+        try:
+            async with engine.connect() as conn:
+                row = (
+                    await conn.execute(
+                        text(
+                            """
+                            SELECT version, completed_at
+                            FROM ops.warehouse_version
+                            ORDER BY version DESC
+                            LIMIT 1
+                            """
+                        )
+                    )
+                ).fetchone()
+        except SQLAlchemyError:
+            # No stamp table yet: entries still expire by TTL.
+            return "none", None
+        if row is None:
+            return "none", None
+        return str(row.version), row.completed_at
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Cache GET responses under CACHED_PREFIXES per warehouse version.
+
+    The ETag is derived from the version and the request URL, so a client revalidating
+    with If-None-Match gets a 304 without the route or the cache being touched. A new
+    version changes every key, which is the invalidation.
+    """
+
+    def __init__(self, app, backend=None, version: Optional[WarehouseVersion] = None):
+        super().__init__(app)
+        self.backend = backend or make_backend()
+        self.version = version or WarehouseVersion()
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method != "GET" or not request.url.path.startswith(CACHED_PREFIXES):
+            return await call_next(request)
+
+        version, completed_at = await self.version.current()
+        query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+        key = hashlib.sha1(f"{version}|{request.url.path}?{query}".encode()).hexdigest()
+        headers = {"Cache-Control": "no-cache"}
+        # Without a version stamp there is nothing stable to validate against: no ETag, TTL only.
+        if completed_at is not None:
+            etag = f'W/"{key}"'
+            headers["ETag"] = etag
+            headers["Last-Modified"] = format_datetime(completed_at.astimezone(timezone.utc), usegmt=True)
+            if _not_modified(request, etag, completed_at):
+                return Response(status_code=304, headers=headers)
+
+        cached = await self.backend.get(key)
+        if cached is not None:
+            status, media_type, body = cached
+            return Response(
+                content=body,
+                status_code=status,
+                media_type=media_type,
+                headers={**headers, "X-Cache": "HIT"},
+            )
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        media_type = response.headers.get("content-type", "application/json")
+        await self.backend.set(key, (response.status_code, media_type, body))
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            media_type=media_type,
+            headers={**headers, "X-Cache": "MISS"},
+        )
@@ -0,0 +1,7 @@
+from datetime import date
+from typing import Optional
+
+
+def to_date_key(value: Optional[date]) -> Optional[int]:
+    """Convert a date to the warehouse's YYYYMMDD date_key (None passes through)."""
+    return int(value.strftime("%Y%m%d")) if value is not None else None
@@ -0,0 +1,33 @@
+from datetime import date
+from typing import List, Optional
+
+from .dates import to_date_key
+
+# Optional filters are added to the WHERE clause only when supplied. A parameter that is
+# only ever compared with NULL (``:x IS NULL OR ...``) has no type Postgres can infer, and
+# psycopg 3 server-side binding rejects it (AmbiguousParameter / DatatypeMismatch).
+
+
+def date_key_conditions(
+    start: Optional[date],
+    end: Optional[date],
+    params: dict,
+    column: str = "date_key",
+) -> List[str]:
+    """Conditions for an inclusive [start, end] range on a YYYYMMDD date_key column.
+
+    Bound values are added to ``params`` as start_key / end_key.
+    """
+    conditions = []
+    if start is not None:
+        params["start_key"] = to_date_key(start)
+        conditions.append(f"{column} >= :start_key")
+    if end is not None:
+        params["end_key"] = to_date_key(end)
+        conditions.append(f"{column} <= :end_key")
+    return conditions
+
+
+def where_clause(conditions: List[str]) -> str:
+    """AND the conditions together; TRUE when there are none."""
+    return " AND ".join(conditions) if conditions else "TRUE"
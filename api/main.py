@@ -1,19 +1,68 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
 
-from .routers import channels, reports, search
+import psycopg
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import DBAPIError
+
+from .cache import ResponseCacheMiddleware
+from .database import engine
+from .metrics import MetricsMiddleware, render_metrics
+from .routers import channels, export, reports, search
 from .schemas import HealthResponse
+from .serialization import WarehouseJSONResponse
+
+# Responses smaller than this are sent uncompressed; 0 turns compression off.
+COMPRESSION_MIN_BYTES = int(os.getenv("API_COMPRESSION_MIN_BYTES", "1024"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await engine.dispose()
+
 
 app = FastAPI(
     title="Medical Telegram Analytical API",
     description="Business-friendly analytics for Ethiopian medical Telegram channels.",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=WarehouseJSONResponse,
 )
 
+if os.getenv("API_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"):
+    app.add_middleware(ResponseCacheMiddleware)
+# Added last so it wraps the cache and also times cache hits.
+app.add_middleware(MetricsMiddleware)
+# Outermost: the cache stores uncompressed bodies and each client negotiates its own encoding.
+if COMPRESSION_MIN_BYTES:
+    try:
+        from brotli_asgi import BrotliMiddleware
+
+        app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True)
+    except ImportError:
+        app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
 app.include_router(channels.router)
 app.include_router(reports.router)
 app.include_router(search.router)
+app.include_router(export.router)
+
+
+@app.exception_handler(DBAPIError)
+async def database_error(request: Request, exc: DBAPIError) -> JSONResponse:
+    if isinstance(exc.orig, psycopg.errors.QueryCanceled):
+        return JSONResponse(status_code=504, content={"detail": "Query exceeded its statement timeout"})
+    return JSONResponse(status_code=500, content={"detail": "Database error"})
 
 
 @app.get("/health", tags=["health"], response_model=HealthResponse)
 def health() -> HealthResponse:
     return HealthResponse(status="ok")
+
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(engine), media_type="text/plain; version=0.0.4")
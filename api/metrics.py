@@ -0,0 +1,174 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with their route; 0 disables the log.
+SLOW_QUERY_MS = float(os.getenv("API_SLOW_QUERY_MS", "0"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Route template of the request being served, so SQL timings can be attributed to it.
+current_route: ContextVar[str] = ContextVar("current_route", default="none")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # Per label set: [count per bucket (+Inf last), sum, count].
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, totals = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0, 0.0]))
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, totals) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(labels, [('le', '+Inf')])} {int(totals[1])}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {totals[0]:g}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {int(totals[1])}")
+        return lines
+
+
+REQUESTS = Counter("api_requests_total", "HTTP requests by route, method and status.")
+REQUEST_LATENCY = Histogram("api_request_duration_seconds", "HTTP request latency by route and method.")
+DB_STATEMENT_LATENCY = Histogram("api_db_statement_duration_seconds", "SQL statement execution time by route.")
+DB_STATEMENT_ROWS = Counter("api_db_statement_rows_total", "Rows returned or affected by SQL statements, by route.")
+DB_POOL_WAIT = Histogram("api_db_pool_wait_seconds", "Time spent waiting for a pooled connection.")
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited (including new connections)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine) -> None:
+    """Attach statement timing hooks to the sync core of an (async) engine."""
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        route = current_route.get()
+        DB_STATEMENT_LATENCY.observe(elapsed, route=route)
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            DB_STATEMENT_ROWS.inc(cursor.rowcount, route=route)
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            logger.warning("Slow query on %s (%.0f ms): %s", route, elapsed * 1000, " ".join(statement.split())[:500])
+
+
+def _pool_lines(engine) -> List[str]:
+    pool = getattr(engine, "sync_engine", engine).pool
+    gauges = [
+        ("api_db_pool_size", "Configured pool size.", pool.size()),
+        ("api_db_pool_checked_out", "Connections currently checked out.", pool.checkedout()),
+        ("api_db_pool_overflow", "Connections open beyond the pool size.", max(pool.overflow(), 0)),
+    ]
+    lines = []
+    for name, help_text, value in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+
+def render_metrics(engine) -> str:
+    lines: List[str] = []
+    for metric in (REQUESTS, REQUEST_LATENCY, DB_STATEMENT_LATENCY, DB_STATEMENT_ROWS, DB_POOL_WAIT):
+        lines += metric.render()
+    lines += _pool_lines(engine)
+    return "\n".join(lines) + "\n"
+
+
+def _route_template(request: Request) -> str:
+    # Label by route template (/channels/{channel_name}/activity) to keep label cardinality bounded.
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Record latency and status per route, including responses served from the cache."""
+
+    async def dispatch(self, request: Request, call_next):
+        route = _route_template(request)
+        token = current_route.set(route)
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route=route, method=request.method)
+            REQUESTS.inc(route=route, method=request.method, status=str(status))
+            current_route.reset(token)
@@ -1,36 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-from ..schemas import ChannelActivitySummary
+from ..database import CHANNELS_TIMEOUT_MS, get_db_with_timeout
+from ..filters import date_key_conditions, where_clause
+from ..serialization import WarehouseJSONResponse, rows_to_dicts
+from ..schemas import ChannelActivityBatch, ChannelActivityPoint, ChannelActivitySummary
 
 router = APIRouter(prefix="/channels", tags=["channels"])
+get_channels_db = get_db_with_timeout(CHANNELS_TIMEOUT_MS)
+
+# Reads the agg_channel_daily rollup: one row per channel per day.
+ACTIVITY_SQL = """
+    SELECT channel_name,
+           SUM(message_count)::bigint AS total_messages,
+           COALESCE(SUM(views_sum)::float / NULLIF(SUM(views_count), 0), 0) AS avg_views,
+           SUM(media_count)::bigint AS total_images,
+           MAX(last_message_at) AS most_recent_message
+    FROM agg_channel_daily
+    WHERE {conditions}
+    GROUP BY channel_name
+    ORDER BY channel_name
+"""
+
+
+@router.get("/activity", response_model=ChannelActivityBatch)
+async def channels_activity(
+    channels: Optional[List[str]] = Query(None, description="Channel names; omit for every channel"),
+    start: Optional[date] = Query(None, description="First message date to include"),
+    end: Optional[date] = Query(None, description="Last message date to include"),
+    db: AsyncSession = Depends(get_channels_db),
+):
+    params = {}
+    conditions = date_key_conditions(start, end, params)
+    if channels:
+        names = list(dict.fromkeys(channels))
+        conditions.append("channel_name = ANY(:names)")
+        params["names"] = names
+    else:
+        names = []
+    sql = text(ACTIVITY_SQL.format(conditions=where_clause(conditions)))
+
+    results = rows_to_dicts((await db.execute(sql, params)).fetchall())
+    found = {summary["channel_name"] for summary in results}
+    return WarehouseJSONResponse({"results": results, "missing": [name for name in names if name not in found]})
 
 
 @router.get("/{channel_name}/activity", response_model=ChannelActivitySummary)
-def channel_activity(channel_name: str, db: Session = Depends(get_db)):
+async def channel_activity(
+    channel_name: str,
+    start: Optional[date] = Query(None, description="First message date to include"),
+    end: Optional[date] = Query(None, description="Last message date to include"),
+    db: AsyncSession = Depends(get_channels_db),
+):
+    params = {"channel_name": channel_name}
+    conditions = ["channel_name = :channel_name", *date_key_conditions(start, end, params)]
+    sql = text(ACTIVITY_SQL.format(conditions=where_clause(conditions)))
+    row = (await db.execute(sql, params)).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Channel not found")
+
+    return WarehouseJSONResponse(dict(row._mapping))
+
+
+@router.get("/{channel_name}/timeseries", response_model=List[ChannelActivityPoint])
+async def channel_timeseries(
+    channel_name: str,
+    granularity: Literal["day", "week", "month"] = Query("day", description="Bucket size"),
+    start: Optional[date] = Query(None, description="First message date to include"),
+    end: Optional[date] = Query(None, description="Last message date to include"),
+    db: AsyncSession = Depends(get_channels_db),
+):
+    params = {"channel_name": channel_name, "granularity": granularity}
+    conditions = ["channel_name = :channel_name", *date_key_conditions(start, end, params)]
     sql = text(
-        """
-        SELECT channel_name,
-               COUNT(*) AS total_messages,
-               AVG(views) AS avg_views,
-               SUM(CASE WHEN has_media THEN 1 ELSE 0 END) AS total_images,
-               MAX(message_date) AS most_recent_message
-        FROM fct_messages
-        WHERE channel_name = :channel_name
-        GROUP BY channel_name
+        f"""
+        SELECT DATE(date_trunc(:granularity, activity_date)) AS period_start,
+               SUM(message_count)::bigint AS total_messages,
+               COALESCE(SUM(views_sum)::float / NULLIF(SUM(views_count), 0), 0) AS avg_views,
+               SUM(forwards_sum)::bigint AS total_forwards,
+               SUM(media_count)::bigint AS total_images
+        FROM agg_channel_daily
+        WHERE {where_clause(conditions)}
+        GROUP BY 1
+        ORDER BY 1
         """
     )
 
-    row = db.execute(sql, {"channel_name": channel_name}).fetchone()
-    if not row:
+    rows = (await db.execute(sql, params)).fetchall()
+    if not rows:
         raise HTTPException(status_code=404, detail="Channel not found")
 
-    return ChannelActivitySummary(
-        channel_name=row.channel_name,
-        total_messages=row.total_messages,
-        avg_views=float(row.avg_views) if row.avg_views is not None else 0.0,
-        total_images=row.total_images,
-        most_recent_message=row.most_recent_message,
-    )
+    return WarehouseJSONResponse(rows_to_dicts(rows))
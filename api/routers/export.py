@@ -0,0 +1,97 @@
+import csv
+import io
+import os
+from datetime import date, timedelta
+from typing import AsyncIterator, Literal, Optional, Union
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+
+from ..database import engine
+from ..filters import where_clause
+from ..serialization import dumps
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Rows fetched per round trip from the server-side cursor; memory is bounded by this.
+EXPORT_BATCH_ROWS = int(os.getenv("API_EXPORT_BATCH_ROWS", "2000"))
+# Each cursor FETCH is a statement; the first one pays for the sort, so give it more room.
+EXPORT_TIMEOUT_MS = int(os.getenv("API_EXPORT_TIMEOUT_MS", "300000"))
+EXPORT_COLUMNS = (
+    "message_id",
+    "channel_name",
+    "message_date",
+    "message_text",
+    "message_length",
+    "views",
+    "forwards",
+    "has_media",
+    "image_path",
+)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _serialize(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+async def _stream_rows(fmt: str, conditions: list, params: dict) -> AsyncIterator[Union[str, bytes]]:
+    # The stream owns its connection: request-scoped sessions are closed before the body is sent.
+    query = text(
+        f"""
+        SELECT {", ".join(EXPORT_COLUMNS)}
+        FROM fct_messages
+        WHERE {where_clause(conditions)}
+        ORDER BY message_date, channel_name, message_id
+        """
+    ).execution_options(yield_per=EXPORT_BATCH_ROWS)
+
+    async with engine.connect() as conn:
+        await conn.execute(
+            text("SELECT set_config('statement_timeout', :timeout, true)"),
+            {"timeout": str(EXPORT_TIMEOUT_MS)},
+        )
+        result = await conn.stream(query, params)
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            async for rows in result.partitions():
+                for row in rows:
+                    writer.writerow([_serialize(v) for v in row])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.getvalue():
+                yield buffer.getvalue()
+        else:
+            async for rows in result.partitions():
+                yield b"".join(dumps(dict(row._mapping)) + b"\n" for row in rows)
+
+
+@router.get("/messages")
+async def export_messages(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Output format"),
+    channel: Optional[str] = Query(None, description="Optional channel_name filter"),
+    start: Optional[date] = Query(None, description="First message date to include"),
+    end: Optional[date] = Query(None, description="Last message date to include"),
+):
+    """Stream fct_messages rows through a server-side cursor; memory stays constant."""
+    conditions, params = [], {}
+    if channel is not None:
+        conditions.append("channel_name = :channel")
+        params["channel"] = channel
+    if start is not None:
+        conditions.append("message_date >= :start")
+        params["start"] = start
+    if end is not None:
+        conditions.append("message_date < :end")
+        params["end"] = end + timedelta(days=1)
+    filename = f"messages_{channel or 'all'}.{format}"
+    return StreamingResponse(
+        _stream_rows(format, conditions, params),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,10 +1,13 @@
+from datetime import date
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import REPORTS_TIMEOUT_MS, get_db_with_timeout
+from ..filters import date_key_conditions, where_clause
+from ..serialization import WarehouseJSONResponse, rows_to_dicts
 from ..schemas import (
     CategoryPerformance,
     MessageStats,
@@ -13,49 +16,46 @@ from ..schemas import (
 )
 
 router = APIRouter(prefix="/reports", tags=["reports"])
+get_reports_db = get_db_with_timeout(REPORTS_TIMEOUT_MS)
 
 
 @router.get("/top-products", response_model=List[TopProduct])
-def top_products(
+async def top_products(
     limit: int = Query(10, ge=1, le=50),
     min_count: int = Query(3, ge=1),
-    db: Session = Depends(get_db),
+    start: Optional[date] = Query(None, description="First message date to include"),
+    end: Optional[date] = Query(None, description="Last message date to include"),
+    channel: Optional[str] = Query(None, description="Filter by channel_name"),
+    db: AsyncSession = Depends(get_reports_db),
 ):
+    # Reads the pre-tokenized fct_keyword_mentions mart (per keyword/channel/day).
+    params = {"min_count": min_count, "limit": limit}
+    conditions = date_key_conditions(start, end, params)
+    if channel is not None:
+        conditions.append("channel_name = :channel")
+        params["channel"] = channel
     query = text(
-        """
-        WITH exploded AS (
-            SELECT
-                lower(word) AS keyword,
-                fm.channel_name
-            FROM fct_messages fm,
-            LATERAL regexp_matches(coalesce(fm.message_text, ''), '\\b[a-z]{4,}\\b', 'g') AS word
-        )
+        f"""
         SELECT keyword,
-               COUNT(*) AS mention_count,
+               SUM(mention_count)::bigint AS mention_count,
                COUNT(DISTINCT channel_name) AS appearing_in_channels
-        FROM exploded
+        FROM fct_keyword_mentions
+        WHERE {where_clause(conditions)}
         GROUP BY keyword
-        HAVING COUNT(*) >= :min_count
+        HAVING SUM(mention_count) >= :min_count
         ORDER BY mention_count DESC
         LIMIT :limit
         """
     )
 
-    rows = db.execute(query, {"min_count": min_count, "limit": limit}).fetchall()
-    return [
-        TopProduct(
-            keyword=row.keyword,
-            mention_count=row.mention_count,
-            appearing_in_channels=row.appearing_in_channels,
-        )
-        for row in rows
-    ]
+    result = await db.execute(query, params)
+    return WarehouseJSONResponse(rows_to_dicts(result.fetchall()))
 
 
 @router.get("/visual-content", response_model=List[VisualContentReport])
-def visual_content(
+async def visual_content(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_reports_db),
 ):
     query = text(
         """
@@ -78,7 +78,8 @@ def visual_content(
         SELECT msg.channel_name,
                msg.total_messages,
                msg.visual_messages,
-               ROUND(100.0 * msg.visual_messages / NULLIF(msg.total_messages, 0), 1) AS visual_percentage,
+               COALESCE(ROUND(100.0 * msg.visual_messages / NULLIF(msg.total_messages, 0), 1), 0)::float
+                   AS visual_percentage,
                cat.image_category AS most_common_category
         FROM msg
         LEFT JOIN cat ON cat.channel_name = msg.channel_name AND cat.rn = 1
@@ -87,80 +88,71 @@ def visual_content(
         """
     )
 
-    rows = db.execute(query, {"limit": limit}).fetchall()
-    return [
-        VisualContentReport(
-            channel_name=row.channel_name,
-            total_messages=row.total_messages,
-            visual_messages=row.visual_messages,
-            visual_percentage=float(row.visual_percentage) if row.visual_percentage is not None else 0.0,
-            most_common_category=row.most_common_category,
-        )
-        for row in rows
-    ]
+    rows = (await db.execute(query, {"limit": limit})).fetchall()
+    return WarehouseJSONResponse(rows_to_dicts(rows))
 
 
 @router.get("/message-stats", response_model=MessageStats)
-def message_stats(db: Session = Depends(get_db)):
+async def message_stats(
+    start: Optional[date] = Query(None, description="First message date to include"),
+    end: Optional[date] = Query(None, description="Last message date to include"),
+    db: AsyncSession = Depends(get_reports_db),
+):
+    # Totals come from the agg_channel_daily rollup: cost follows days, not messages.
+    params = {}
+    date_filter = where_clause(date_key_conditions(start, end, params))
     query = text(
-        """
+        f"""
         WITH totals AS (
-            SELECT COUNT(*) AS total_messages,
-                   AVG(views) AS avg_views,
-                   AVG(CASE WHEN has_media THEN 1 ELSE 0 END) AS pct_with_media
-            FROM fct_messages
+            SELECT SUM(message_count)::bigint AS total_messages,
+                   SUM(views_sum)::float / NULLIF(SUM(views_count), 0) AS avg_views,
+                   SUM(media_count)::float / NULLIF(SUM(message_count), 0) AS pct_with_media
+            FROM agg_channel_daily
+            WHERE {date_filter}
         ), detections AS (
             SELECT COUNT(DISTINCT message_id) AS detected_messages
             FROM fct_image_detections
+            WHERE {date_filter}
         )
         SELECT totals.total_messages,
-               totals.avg_views,
-               totals.pct_with_media,
-               detections.detected_messages
+               COALESCE(totals.avg_views, 0) AS avg_views,
+               COALESCE(totals.pct_with_media * 100, 0) AS pct_with_media,
+               100.0::float * detections.detected_messages / NULLIF(totals.total_messages, 0)
+                   AS pct_with_detected_images
         FROM totals CROSS JOIN detections
         """
     )
 
-    row = db.execute(query).fetchone()
-    if not row or row.total_messages == 0:
+    row = (await db.execute(query, params)).fetchone()
+    if not row or not row.total_messages:
         raise HTTPException(status_code=404, detail="No messages found")
 
-    pct_with_media = float(row.pct_with_media) * 100 if row.pct_with_media is not None else 0.0
-    pct_with_detected = 100.0 * (row.detected_messages or 0) / float(row.total_messages)
-
-    return MessageStats(
-        total_messages=row.total_messages,
-        avg_views=float(row.avg_views) if row.avg_views is not None else 0.0,
-        pct_with_media=pct_with_media,
-        pct_with_detected_images=pct_with_detected,
-    )
+    return WarehouseJSONResponse(dict(row._mapping))
 
 
 @router.get("/category-performance", response_model=List[CategoryPerformance])
-def category_performance(
+async def category_performance(
     channel: Optional[str] = Query(None, description="Filter by channel_name"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_reports_db),
 ):
+    params = {}
+    conditions = []
+    if channel is not None:
+        conditions.append("m.channel_name = :channel")
+        params["channel"] = channel
     query = text(
-        """
+        f"""
         SELECT fid.image_category,
                COUNT(*) AS message_count,
-               AVG(m.views) AS avg_views
+               COALESCE(AVG(m.views), 0)::float AS avg_views
         FROM fct_image_detections fid
         JOIN fct_messages m
           ON m.message_id = fid.message_id AND m.channel_name = fid.channel_name
-        WHERE (:channel IS NULL OR m.channel_name = :channel)
+        WHERE {where_clause(conditions)}
         GROUP BY fid.image_category
         ORDER BY avg_views DESC NULLS LAST, message_count DESC
         """
     )
 
-    rows = db.execute(query, {"channel": channel}).fetchall()
-    return [
-        CategoryPerformance(
-            image_category=row.image_category,
-            avg_views=float(row.avg_views) if row.avg_views is not None else 0.0,
-            message_count=row.message_count,
-        )
-        for row in rows
-    ]
+    rows = (await db.execute(query, params)).fetchall()
+    return WarehouseJSONResponse(rows_to_dicts(rows))
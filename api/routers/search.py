@@ -1,54 +1,122 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import SEARCH_TIMEOUT_MS, get_db_with_timeout
+from ..pagination import (
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_datetime,
+    parse_cursor_float,
+    parse_cursor_int,
+    parse_cursor_str,
+)
 from ..schemas import MessagePreview
+from ..serialization import WarehouseJSONResponse, rows_to_dicts
 
 router = APIRouter(prefix="/search", tags=["search"])
+get_search_db = get_db_with_timeout(SEARCH_TIMEOUT_MS)
+
+# Full-text matches come from the GIN index on fct_messages.message_tsv; substring
+# matches (e.g. inside Amharic words the 'simple' parser keeps whole) from the
+# pg_trgm index on message_text. Postgres combines both with a BitmapOr.
+# Pages are keyset-paginated on the ORDER BY columns, so page N costs the same as page 1.
+SEARCH_SQL = """
+WITH q AS (
+    SELECT websearch_to_tsquery('simple', :q) AS tsq
+), scored AS (
+    SELECT m.message_id,
+           m.channel_name,
+           m.message_date,
+           m.message_text,
+           m.views,
+           m.has_media,
+           m.message_tsv @@ q.tsq AS fts_match,
+           GREATEST(
+               ts_rank_cd(m.message_tsv, q.tsq, 32),
+               word_similarity(:q, COALESCE(m.message_text, ''))
+           )::float8 AS rank
+    FROM fct_messages m
+    CROSS JOIN q
+    WHERE (m.message_tsv @@ q.tsq OR m.message_text ILIKE '%' || :q || '%')
+      {channel_filter}
+), matches AS (
+    SELECT *
+    FROM scored
+    {keyset}
+    ORDER BY {order_by}
+    LIMIT :limit
+)
+SELECT matches.message_id,
+       matches.channel_name,
+       matches.message_date,
+       LEFT(COALESCE(matches.message_text, ''), 500) AS message_text,
+       matches.views,
+       matches.has_media,
+       fid.image_category,
+       matches.rank,
+       CASE
+           WHEN matches.fts_match THEN ts_headline(
+               'simple',
+               COALESCE(matches.message_text, ''),
+               q.tsq,
+               'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2'
+           )
+           ELSE LEFT(COALESCE(matches.message_text, ''), 200)
+       END AS snippet
+FROM matches
+CROSS JOIN q
+LEFT JOIN fct_image_detections fid
+  ON matches.message_id = fid.message_id AND matches.channel_name = fid.channel_name
+ORDER BY {order_by}
+"""
+
+# Sort keys per order; the cursor carries the last row's values for these columns.
+SORT_KEYS = {
+    "relevance": ("rank", "message_date", "channel_name", "message_id"),
+    "recent": ("message_date", "channel_name", "message_id"),
+}
+# Cursors are client input: each value must have its column's type before it is bound.
+CURSOR_PARSERS = {
+    "rank": parse_cursor_float,
+    "message_date": parse_cursor_datetime,
+    "channel_name": parse_cursor_str,
+    "message_id": parse_cursor_int,
+}
 
 
 @router.get("/messages", response_model=List[MessagePreview])
-def search_messages(
+async def search_messages(
     query: str = Query(..., min_length=2, description="Keyword to search in message_text"),
     channel: Optional[str] = Query(None, description="Optional channel_name filter"),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    order: Literal["relevance", "recent"] = Query("relevance", description="Sort by relevance rank or by date"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_search_db),
 ):
-    sql = text(
-        """
-        SELECT m.message_id,
-               m.channel_name,
-               m.message_date,
-               LEFT(COALESCE(m.message_text, ''), 500) AS message_text,
-               m.views,
-               m.has_media,
-               fid.image_category
-        FROM fct_messages m
-        LEFT JOIN fct_image_detections fid
-          ON m.message_id = fid.message_id AND m.channel_name = fid.channel_name
-        WHERE m.message_text ILIKE '%' || :q || '%'
-          AND (:channel IS NULL OR m.channel_name = :channel)
-        ORDER BY m.message_date DESC
-        LIMIT :limit
-        """
-    )
-
-    rows = db.execute(sql, {"q": query, "channel": channel, "limit": limit}).fetchall()
-    if not rows:
+    keys = SORT_KEYS[order]
+    order_by = ", ".join(f"{key} DESC" for key in keys)
+    params = {"q": query, "limit": limit}
+    channel_filter = ""
+    if channel is not None:
+        channel_filter = "AND m.channel_name = :channel"
+        params["channel"] = channel
+    keyset = ""
+    if cursor is not None:
+        values = decode_cursor(cursor, len(keys))
+        after = {f"after_{key}": CURSOR_PARSERS[key](value) for key, value in zip(keys, values)}
+        keyset = "WHERE ({}) < ({})".format(", ".join(keys), ", ".join(f":after_{key}" for key in keys))
+        params.update(after)
+
+    sql = text(SEARCH_SQL.format(order_by=order_by, keyset=keyset, channel_filter=channel_filter))
+
+    rows = (await db.execute(sql, params)).fetchall()
+    if not rows and cursor is None:
         raise HTTPException(status_code=404, detail="No messages found")
 
-    return [
-        MessagePreview(
-            message_id=row.message_id,
-            channel_name=row.channel_name,
-            message_date=row.message_date,
-            message_text=row.message_text,
-            views=row.views,
-            has_media=row.has_media,
-            image_category=row.image_category,
-        )
-        for row in rows
-    ]
+    response = WarehouseJSONResponse(rows_to_dicts(rows))
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor([getattr(rows[-1], key) for key in keys])
+    return response
@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -22,6 +22,19 @@ class ChannelActivitySummary(BaseModel):
     most_recent_message: Optional[datetime]
 
 
+class ChannelActivityBatch(BaseModel):
+    results: List[ChannelActivitySummary]
+    missing: List[str]
+
+
+class ChannelActivityPoint(BaseModel):
+    period_start: date
+    total_messages: int
+    avg_views: float
+    total_forwards: int
+    total_images: int
+
+
 class MessagePreview(BaseModel):
     message_id: int
     channel_name: str
@@ -30,6 +43,8 @@ class MessagePreview(BaseModel):
     views: Optional[int]
     has_media: bool
     image_category: Optional[str]
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
 
 
 class VisualContentReport(BaseModel):
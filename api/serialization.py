@@ -0,0 +1,36 @@
+from decimal import Decimal
+from typing import Any, Iterable, List
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding shared by the API: Decimal (numeric columns) as float, UTC as ``Z``."""
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+    )
+
+
+class WarehouseJSONResponse(ORJSONResponse):
+    """orjson response that also encodes Decimal (numeric columns) and writes UTC as ``Z``."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_to_dicts(rows: Iterable) -> List[dict]:
+    """Turn result rows into plain dicts, skipping per-row model validation.
+
+    Only for warehouse queries whose SELECT list already matches the response model
+    (names, casts, COALESCEs); the model stays on the route for the OpenAPI schema.
+    """
+    return [dict(row._mapping) for row in rows]
@@ -0,0 +1,207 @@
+"""Load-benchmark every API route at fixed concurrency levels.
+
+Each (route, concurrency) pair gets a warm-up and then a fixed number of requests
+spread over that many threads. p50/p95/p99 latency and throughput are written to
+a JSON file named after the commit, so two runs can be diffed directly.
+
+Run generate_warehouse.py first so the API has production-sized marts to read.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from itertools import count
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, urlencode
+from urllib.request import urlopen
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.getenv("BENCH_BASE_URL", "http://localhost:8000")
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_CONCURRENCY = "1,8,32"
+
+
+def build_routes(channel: str, channels: List[str]) -> Dict[str, tuple]:
+    """Name -> (path, query params) for every route in api/routers."""
+    end = date.today()
+    month_ago = (end - timedelta(days=30)).isoformat()
+    encoded = quote(channel, safe="")
+    return {
+        "reports.top_products": ("/reports/top-products", {"limit": 20}),
+        "reports.top_products_window": ("/reports/top-products", {"limit": 20, "start": month_ago}),
+        "reports.visual_content": ("/reports/visual-content", {"limit": 20}),
+        "reports.message_stats": ("/reports/message-stats", {}),
+        "reports.category_performance": ("/reports/category-performance", {}),
+        "channels.activity": (f"/channels/{encoded}/activity", {}),
+        "channels.activity_batch": ("/channels/activity", {"channels": channels[:10]}),
+        "channels.timeseries_week": (f"/channels/{encoded}/timeseries", {"granularity": "week"}),
+        "search.relevance": ("/search/messages", {"query": "paracetamol", "limit": 20}),
+        "search.recent": ("/search/messages", {"query": "insulin", "limit": 20, "order": "recent"}),
+        "export.ndjson_month": ("/export/messages", {"channel": channel, "start": month_ago}),
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def fetch(url: str, timeout: float) -> int:
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except HTTPError as exc:
+        return exc.code
+
+
+def make_url(base_url: str, path: str, params: dict, bust: Optional[int]) -> str:
+    params = dict(params)
+    if bust is not None:
+        # Unknown params are ignored by the routes but change the response-cache key.
+        params["_bench"] = bust
+    query = urlencode(params, doseq=True)
+    return f"{base_url}{path}?{query}" if query else f"{base_url}{path}"
+
+
+def run_case(
+    base_url: str,
+    path: str,
+    params: dict,
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    timeout: float,
+    cache: bool,
+) -> dict:
+    counter = count()
+    lock = threading.Lock()
+    latencies: List[float] = []
+    errors = 0
+
+    def one_request() -> None:
+        nonlocal errors
+        url = make_url(base_url, path, params, None if cache else next(counter))
+        start = time.perf_counter()
+        try:
+            status = fetch(url, timeout)
+        except (URLError, OSError):
+            status = 0
+        elapsed = time.perf_counter() - start
+        with lock:
+            if 200 <= status < 300:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    for _ in range(warmup):
+        one_request()
+    latencies.clear()
+    errors = 0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in pool.map(lambda _: one_request(), range(requests)):
+            pass
+    wall = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None  # noqa: E731
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": to_ms(percentile(ordered, 50)),
+        "p95_ms": to_ms(percentile(ordered, 95)),
+        "p99_ms": to_ms(percentile(ordered, 99)),
+        "mean_ms": to_ms(sum(ordered) / len(ordered)) if ordered else None,
+        "throughput_rps": round(len(ordered) / wall, 2) if wall else None,
+    }
+
+
+def discover_channels(base_url: str, timeout: float) -> List[str]:
+    with urlopen(f"{base_url}/channels/activity", timeout=timeout) as response:
+        body = json.loads(response.read())
+    return [row["channel_name"] for row in body["results"]]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every API route at several concurrency levels.")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY, help="Comma-separated thread counts")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route and concurrency level")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--routes", help="Comma-separated route names to run (default: all)")
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Let the response cache serve repeats (default busts it so queries are measured)",
+    )
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    channels = discover_channels(args.base_url, args.timeout)
+    if not channels:
+        raise SystemExit("No channels returned by /channels/activity; run generate_warehouse.py first")
+    routes = build_routes(channels[0], channels)
+    if args.routes:
+        wanted = set(args.routes.split(","))
+        routes = {name: route for name, route in routes.items() if name in wanted}
+
+    commit = git_commit()
+    results = []
+    for name, (path, params) in routes.items():
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            result = run_case(
+                args.base_url, path, params, concurrency, args.requests, args.warmup, args.timeout, args.cache
+            )
+            result["route"] = name
+            results.append(result)
+            logger.info(
+                "%-32s c=%-3d p50=%sms p95=%sms p99=%sms %s rps (%d errors)",
+                name,
+                concurrency,
+                result["p50_ms"],
+                result["p95_ms"],
+                result["p99_ms"],
+                result["throughput_rps"],
+                result["errors"],
+            )
+
+    output = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "commit": commit,
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "cache": args.cache,
+        "results": results,
+    }
+    output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    logger.info("Saved results to %s", output)
+
+
+if __name__ == "__main__":
+    main()
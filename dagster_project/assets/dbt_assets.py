@@ -1,16 +1,60 @@
+import time
 from pathlib import Path
 
-from dagster import AssetExecutionContext
+from dagster import AssetExecutionContext, AssetObservation
 from dagster_dbt import dbt_assets, DbtCliResource
 
 from ..resources import dbt
+from ..stage_metrics import record_stage_metrics
 
 # Use the compiled manifest.json from the dbt project's target directory
 MANIFEST_PATH = Path(__file__).parent.parent.parent / "medical_warehouse" / "target" / "manifest.json"
 
 
+def summarize_run_results(run_results: dict) -> dict:
+    """Per-node timings and row counts from dbt's run_results.json."""
+    nodes = {
+        result["unique_id"]: {
+            "status": result["status"],
+            "seconds": round(result.get("execution_time") or 0.0, 3),
+            "rows_affected": (result.get("adapter_response") or {}).get("rows_affected"),
+        }
+        for result in run_results.get("results", [])
+    }
+    models = {k: v for k, v in nodes.items() if k.startswith("model.")}
+    return {
+        "models": len(models),
+        "tests": sum(1 for k in nodes if k.startswith("test.")),
+        "failures": sum(1 for v in nodes.values() if v["status"] in ("error", "fail")),
+        "model_seconds": round(sum(v["seconds"] for v in models.values()), 3),
+        "nodes": nodes,
+    }
+
+
 @dbt_assets(manifest=MANIFEST_PATH)
 def dbt_transforms(context: AssetExecutionContext, dbt: DbtCliResource):
     """Run full dbt build, exposing dbt models as assets."""
     # Stream dbt logs/results into Dagster
-    yield from dbt.cli(["build"], context=context).stream()
+    invocation = dbt.cli(["build"], context=context)
+    started = time.perf_counter()
+    metadata = None
+    try:
+        yield from invocation.stream()
+    finally:
+        elapsed = time.perf_counter() - started
+        try:
+            summary = summarize_run_results(invocation.get_artifact("run_results.json"))
+        except FileNotFoundError:
+            summary = None
+        if summary is not None:
+            slowest = sorted(summary["nodes"].items(), key=lambda item: item[1]["seconds"], reverse=True)[:5]
+            context.log.info(
+                "Slowest dbt nodes: " + ", ".join(f"{node} {info['seconds']}s" for node, info in slowest)
+            )
+            metadata = record_stage_metrics(context, "dbt", summary, elapsed)
+    if metadata is not None:
+        # dbt's own events already carry each node's timing; the build totals go on every
+        # asset of the run, leaving the per-node breakdown to ops.pipeline_stage_runs.
+        build_metadata = {key: value for key, value in metadata.items() if key != "nodes"}
+        for asset_key in context.selected_asset_keys:
+            yield AssetObservation(asset_key=asset_key, metadata=build_metadata)
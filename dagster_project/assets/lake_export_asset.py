@@ -0,0 +1,26 @@
+import time
+
+from dagster import asset, AssetExecutionContext, Output
+
+from ..log_forwarding import forward_logs
+from ..stage_metrics import rate, record_stage_metrics
+
+
+@asset(deps=["raw_postgres_load", "yolo_csv_to_postgres"])
+def parquet_lake_export(context: AssetExecutionContext) -> Output[str]:
+    """Append newly loaded raw messages and detections to the Parquet lake (data/lake)."""
+    from src import export_lake
+
+    started = time.perf_counter()
+    with forward_logs(context, "src"):
+        results = export_lake.export_lake()
+    elapsed = time.perf_counter() - started
+
+    rows = sum(stats["rows"] for stats in results.values())
+    metrics = {"rows": rows, "rows_per_second": rate(rows, elapsed)}
+    for name, stats in results.items():
+        metrics[f"{name}_rows"] = stats["rows"]
+        metrics[f"{name}_files"] = stats["files"]
+        metrics[f"{name}_watermark"] = stats["watermark"]
+    metadata = record_stage_metrics(context, "lake_export", metrics, elapsed)
+    return Output(str(export_lake.LAKE_DIR), metadata=metadata)
@@ -1,23 +1,34 @@
-import subprocess
+import time
 
-from dagster import asset, AssetExecutionContext, AssetIn
+from dagster import asset, AssetExecutionContext, Output
 
+from ..log_forwarding import forward_logs
+from ..partitions import day_channel_partitions, partition_day_channel
+from ..stage_metrics import rate, record_stage_metrics
 
-@asset(ins={"raw_telegram_data": AssetIn()})
-def raw_postgres_load(context: AssetExecutionContext) -> str:
-    """Load raw Telegram JSON into Postgres (raw.telegram_messages)."""
-    context.log.info("Loading raw data to Postgres via src/load_raw.py ...")
 
-    result = subprocess.run([
-        "python",
-        "src/load_raw.py",
-    ], capture_output=True, text=True, check=False)
+@asset(partitions_def=day_channel_partitions, deps=["raw_telegram_data"])
+def raw_postgres_load(context: AssetExecutionContext) -> Output[str]:
+    """Load one day's raw JSON for one channel into Postgres (raw.telegram_messages)."""
+    from src import load_raw
 
-    if result.stdout:
-        context.log.info(result.stdout)
-    if result.stderr:
-        context.log.warning(result.stderr)
-    if result.returncode != 0:
-        raise RuntimeError(f"Raw load failed with code {result.returncode}")
+    day, channel = partition_day_channel(context)
+    context.log.info(f"Loading {channel} for {day} into raw.telegram_messages ...")
+    started = time.perf_counter()
+    with forward_logs(context, "src"):
+        stats = load_raw.load_json_to_postgres(mode="copy", day=day, channel=channel)
+    elapsed = time.perf_counter() - started
 
-    return "raw.telegram_messages loaded"
+    metadata = record_stage_metrics(
+        context,
+        "raw_load",
+        {
+            **stats,
+            "rows_per_second": rate(stats["inserted"] + stats["skipped"], elapsed),
+        },
+        elapsed,
+    )
+    if stats["files_failed"]:
+        raise RuntimeError(f"Raw load failed for {stats['files_failed']} file(s) of {channel} on {day}")
+
+    return Output("raw.telegram_messages loaded", metadata=metadata)
@@ -1,26 +1,46 @@
+import asyncio
+import time
+from datetime import date
 from pathlib import Path
-import subprocess
 
-from dagster import asset, AssetExecutionContext
+from dagster import asset, AssetExecutionContext, Output
 
+from ..locks import advisory_lock
+from ..log_forwarding import forward_logs
+from ..partitions import day_channel_partitions, partition_day_channel
+from ..stage_metrics import rate, record_stage_metrics
 
-@asset
-def raw_telegram_data(context: AssetExecutionContext) -> Path:
-    """Run the Telegram scraper to fetch latest messages and images."""
-    context.log.info("Starting Telegram scrape via src/scraper.py ...")
 
-    result = subprocess.run([
-        "python",
-        "src/scraper.py",
-    ], capture_output=True, text=True, check=False)
+@asset(
+    partitions_def=day_channel_partitions,
+    # One Telegram session file: partitions must not scrape in parallel (limit set in definitions.py).
+    op_tags={"dagster/concurrency_key": "telegram"},
+)
+def raw_telegram_data(context: AssetExecutionContext) -> Output[Path]:
+    """Scrape one channel's messages and images for one day into data/raw/telegram_messages/<day>/."""
+    # Imported here so loading the code location does not pull in Telethon.
+    from src import scraper
 
-    if result.stdout:
-        context.log.info(result.stdout)
-    if result.stderr:
-        context.log.warning(result.stderr)
-    if result.returncode != 0:
-        raise RuntimeError(f"Scraper failed with code {result.returncode}")
+    day, channel = partition_day_channel(context)
+    context.log.info(f"Scraping {channel} for {day}")
+    # The advisory lock also holds where the instance storage ignores concurrency keys.
+    with advisory_lock(context, "telegram"), forward_logs(context, "src"):
+        started = time.perf_counter()
+        result = asyncio.run(scraper.scrape_channel_day(channel, date.fromisoformat(day)))
+        elapsed = time.perf_counter() - started
 
-    out_path = Path("data/raw/telegram_messages")
+    out_path = result["path"]
+    metadata = record_stage_metrics(
+        context,
+        "scrape",
+        {
+            "messages": result["messages"],
+            "media_messages": result["media_messages"],
+            "images": result["images"],
+            "output_bytes": out_path.stat().st_size if out_path.exists() else 0,
+            "messages_per_second": rate(result["messages"], elapsed),
+        },
+        elapsed,
+    )
     context.log.info(f"Scrape complete. Raw messages at: {out_path}")
-    return out_path
+    return Output(out_path, metadata=metadata)
@@ -1,26 +1,74 @@
-import subprocess
+import json
+import time
 from pathlib import Path
+from typing import List
 
-from dagster import asset, AssetExecutionContext, AssetIn
+from dagster import asset, AssetExecutionContext, Output
 
+from ..log_forwarding import forward_logs
+from ..partitions import day_channel_partitions, partition_day_channel
+from ..stage_metrics import rate, record_stage_metrics
 
-@asset(ins={"raw_postgres_load": AssetIn()})
-def yolo_image_detections(context: AssetExecutionContext) -> Path:
-    """Run YOLO on images to produce enriched detections CSV."""
-    context.log.info("Running YOLO enrichment via src/yolo_detect.py ...")
+RAW_BASE = Path("data/raw/telegram_messages")
+IMG_DIR = Path("data/raw/images")
+OUTBOX_DIR = Path("data/enriched/yolo_detections")
 
-    result = subprocess.run([
-        "python",
-        "src/yolo_detect.py",
-    ], capture_output=True, text=True, check=False)
 
-    if result.stdout:
-        context.log.info(result.stdout)
-    if result.stderr:
-        context.log.warning(result.stderr)
-    if result.returncode != 0:
-        raise RuntimeError(f"YOLO enrichment failed with code {result.returncode}")
+def partition_outbox(day: str, channel: str) -> Path:
+    return OUTBOX_DIR / day / f"{channel}.csv"
 
-    out_csv = Path("data/enriched/yolo_detections.csv")
-    context.log.info(f"YOLO detections CSV at: {out_csv}")
-    return out_csv
+
+def partition_images(day: str, channel: str) -> List[Path]:
+    """Images of one channel's raw messages for one day.
+
+    Paths are rebuilt from IMG_DIR/<channel>/<message_id>.jpg (the scraper's layout)
+    rather than read from ``image_path``, which holds whatever separator the scraping
+    machine used (``data\\raw\\...`` from Windows).
+    """
+    images = []
+    for raw_file in (RAW_BASE / day / f"{channel}.json", RAW_BASE / day / f"{channel}.jsonl"):
+        if not raw_file.exists():
+            continue
+        with raw_file.open("r", encoding="utf-8") as f:
+            if raw_file.suffix == ".jsonl":
+                messages = (json.loads(line) for line in f if line.endswith("\n") and line.strip())
+            else:
+                messages = json.load(f) or []
+            images.extend(IMG_DIR / channel / f"{m['message_id']}.jpg" for m in messages if m.get("image_path"))
+    return sorted(set(images))
+
+
+@asset(
+    partitions_def=day_channel_partitions,
+    deps=["raw_postgres_load"],
+    op_tags={"dagster/concurrency_key": "yolo"},
+)
+def yolo_image_detections(context: AssetExecutionContext) -> Output[Path]:
+    """Run YOLO on one day's images for one channel into a per-partition CSV outbox."""
+    # Imported here so loading the code location does not pull in ultralytics/torch.
+    from src import yolo_detect
+
+    day, channel = partition_day_channel(context)
+    images = partition_images(day, channel)
+    out_csv = partition_outbox(day, channel)
+    context.log.info(f"Running YOLO on {len(images)} images of {channel} for {day} ...")
+    started = time.perf_counter()
+    with forward_logs(context, "src"):
+        stats = yolo_detect.run_detection(images=images, output_csv=out_csv)
+    elapsed = time.perf_counter() - started
+
+    metadata = record_stage_metrics(
+        context,
+        "yolo_detect",
+        {
+            "images": len(images),
+            "inferred": stats["inferred"],
+            "reused_from_cache": stats["reused"],
+            "rows": stats["rows"],
+            "inference_seconds": round(stats["inference_seconds"], 3),
+            "images_per_second": rate(stats["inferred"], stats["inference_seconds"]),
+        },
+        elapsed,
+    )
+    context.log.info(f"Appended {stats['rows']} detections to {out_csv}")
+    return Output(out_csv, metadata=metadata)
@@ -1,10 +1,30 @@
-from dagster import Definitions, ScheduleDefinition, AssetSelection
+import os
+from datetime import timedelta
+
+from dagster import (
+    AssetKey,
+    AssetSelection,
+    DagsterRunStatus,
+    DefaultSensorStatus,
+    Definitions,
+    MultiPartitionKey,
+    RunRequest,
+    RunsFilter,
+    SensorResult,
+    SkipReason,
+    define_asset_job,
+    multi_asset_sensor,
+    schedule,
+    sensor,
+)
 
 from .assets.scraper_asset import raw_telegram_data
 from .assets.raw_load_asset import raw_postgres_load
 from .assets.yolo_enrich_asset import yolo_image_detections
 from .assets.yolo_load_asset import yolo_csv_to_postgres
 from .assets.dbt_assets import dbt_transforms
+from .assets.lake_export_asset import parquet_lake_export
+from .partitions import channel_partitions, day_channel_partitions
 from .resources import dbt
 
 all_assets = [
@@ -13,26 +33,110 @@ all_assets = [
     yolo_image_detections,
     yolo_csv_to_postgres,
     dbt_transforms,
+    parquet_lake_export,
 ]
 
-# Define a simple daily schedule that runs the full pipeline
-full_pipeline_job = AssetSelection.assets(
-    raw_telegram_data,
-    raw_postgres_load,
-    yolo_image_detections,
-    yolo_csv_to_postgres,
-    dbt_transforms,
-).to_job(name="daily_full_pipeline")
+# Scrape -> load -> detect -> load detections, one run per (day, channel) partition.
+daily_ingest_job = define_asset_job(
+    name="daily_ingest",
+    selection=AssetSelection.assets(
+        raw_telegram_data,
+        raw_postgres_load,
+        yolo_image_detections,
+        yolo_csv_to_postgres,
+    ),
+    partitions_def=day_channel_partitions,
+)
+
+dbt_job = define_asset_job(name="dbt_transforms_job", selection=AssetSelection.assets(dbt_transforms))
+
+lake_export_job = define_asset_job(name="lake_export_job", selection=AssetSelection.assets(parquet_lake_export))
+
+
+# Op concurrency limits (dagster/concurrency_key tags): one Telegram session, one GPU.
+# Applied when a key has no limit yet, so `dagster instance concurrency set` still overrides them.
+CONCURRENCY_LIMITS = {"telegram": 1, "yolo": 1}
+IN_FLIGHT_STATUSES = [
+    DagsterRunStatus.QUEUED,
+    DagsterRunStatus.NOT_STARTED,
+    DagsterRunStatus.STARTING,
+    DagsterRunStatus.STARTED,
+]
+
+
+def ensure_concurrency_limits(instance) -> None:
+    storage = instance.event_log_storage
+    if not storage.supports_global_concurrency_limits:
+        return
+    configured = storage.get_concurrency_keys()
+    for key, limit in CONCURRENCY_LIMITS.items():
+        if key not in configured:
+            storage.set_concurrency_slots(key, limit)
+
+
+@sensor(minimum_interval_seconds=300, default_status=DefaultSensorStatus.RUNNING)
+def channel_partitions_sensor(context):
+    """Register every configured channel as a dynamic partition."""
+    from src.scraper import CHANNELS
+
+    ensure_concurrency_limits(context.instance)
 
-full_pipeline_schedule = ScheduleDefinition(
-    job=full_pipeline_job,
-    cron_schedule="0 2 * * *",  # 2 AM daily
-    name="daily_pipeline_schedule",
+    channels = [c.strip() for c in os.getenv("SCRAPER_CHANNELS", ",".join(CHANNELS)).split(",") if c.strip()]
+    known = set(context.instance.get_dynamic_partitions(channel_partitions.name))
+    missing = [c for c in channels if c not in known]
+    if not missing:
+        return SensorResult(run_requests=[])
+    return SensorResult(dynamic_partitions_requests=[channel_partitions.build_add_request(missing)])
+
+
+@schedule(job=daily_ingest_job, cron_schedule="0 2 * * *", name="daily_ingest_schedule")
+def daily_ingest_schedule(context):
+    """At 2 AM, ingest the previous (complete) day for every channel: one run each."""
+    ensure_concurrency_limits(context.instance)
+    day = (context.scheduled_execution_time - timedelta(days=1)).strftime("%Y-%m-%d")
+    for channel in context.instance.get_dynamic_partitions(channel_partitions.name):
+        yield RunRequest(
+            run_key=f"{day}|{channel}",
+            partition_key=MultiPartitionKey({"date": day, "channel": channel}),
+        )
+
+
+@multi_asset_sensor(
+    monitored_assets=[AssetKey("raw_postgres_load"), AssetKey("yolo_csv_to_postgres")],
+    jobs=[dbt_job, lake_export_job],
+    minimum_interval_seconds=300,
+    default_status=DefaultSensorStatus.RUNNING,
+    name="ingest_complete_sensor",
 )
+def ingest_complete_sensor(context):
+    """Run dbt and the lake export once new raw data has landed and no ingest run is in flight.
+
+    dbt models are incremental, so each build only processes what the ingest runs added.
+    Waiting for the in-flight runs means one build per batch (e.g. the nightly fan-out
+    over channels), not one per partition.
+    """
+    latest = [record for record in context.latest_materialization_records_by_key().values() if record]
+    if not latest:
+        return SkipReason("No new raw loads")
+    in_flight = context.instance.get_run_ids(
+        RunsFilter(job_name=daily_ingest_job.name, statuses=IN_FLIGHT_STATUSES),
+        limit=1,
+    )
+    if in_flight:
+        return SkipReason(f"Waiting for ingest run {in_flight[0]}")
+
+    batch = max(record.storage_id for record in latest)
+    context.advance_all_cursors()
+    return [
+        RunRequest(run_key=f"dbt|{batch}", job_name=dbt_job.name),
+        RunRequest(run_key=f"lake|{batch}", job_name=lake_export_job.name),
+    ]
 
 
 defs = Definitions(
     assets=all_assets,
+    jobs=[daily_ingest_job, dbt_job, lake_export_job],
     resources={"dbt": dbt},
-    schedules=[full_pipeline_schedule],
+    schedules=[daily_ingest_schedule],
+    sensors=[channel_partitions_sensor, ingest_complete_sensor],
 )
@@ -0,0 +1,25 @@
+from contextlib import contextmanager
+
+from dagster import AssetExecutionContext
+from sqlalchemy import text
+
+from .stage_metrics import get_engine
+
+
+@contextmanager
+def advisory_lock(context: AssetExecutionContext, name: str):
+    """Hold the Postgres advisory lock ``name`` for the duration of the block.
+
+    Serializes the block across runs and processes whatever the Dagster storage (the
+    default sqlite storage does not enforce op concurrency keys). The lock is released
+    on exit, or by Postgres if the process dies.
+    """
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        params = {"name": name}
+        if not conn.execute(text("SELECT pg_try_advisory_lock(hashtext(:name))"), params).scalar():
+            context.log.info(f"Waiting for the '{name}' lock held by another run ...")
+            conn.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), params)
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), params)
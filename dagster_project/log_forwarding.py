@@ -0,0 +1,30 @@
+import logging
+from contextlib import contextmanager
+
+from dagster import AssetExecutionContext
+
+
+class _DagsterLogHandler(logging.Handler):
+    def __init__(self, context: AssetExecutionContext):
+        super().__init__()
+        self.context = context
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.context.log.log(record.levelno, self.format(record))
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+
+
+@contextmanager
+def forward_logs(context: AssetExecutionContext, *logger_names: str):
+    """Stream records from the named loggers to the Dagster run log as they are emitted."""
+    handler = _DagsterLogHandler(context)
+    loggers = [logging.getLogger(name) for name in logger_names]
+    for logger in loggers:
+        logger.addHandler(handler)
+    try:
+        yield
+    finally:
+        for logger in loggers:
+            logger.removeHandler(handler)
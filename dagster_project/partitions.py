@@ -0,0 +1,21 @@
+import os
+from typing import Tuple
+
+from dagster import (
+    AssetExecutionContext,
+    DailyPartitionsDefinition,
+    DynamicPartitionsDefinition,
+    MultiPartitionsDefinition,
+)
+
+# Daily keys are YYYY-MM-DD, the same names as the data/raw/telegram_messages/ folders.
+daily_partitions = DailyPartitionsDefinition(start_date=os.getenv("PIPELINE_START_DATE", "2025-01-01"))
+# Channels are added at runtime by channel_partitions_sensor (from SCRAPER_CHANNELS).
+channel_partitions = DynamicPartitionsDefinition(name="telegram_channels")
+day_channel_partitions = MultiPartitionsDefinition({"date": daily_partitions, "channel": channel_partitions})
+
+
+def partition_day_channel(context: AssetExecutionContext) -> Tuple[str, str]:
+    """Return (YYYY-MM-DD, channel) for the partition being materialized."""
+    keys = context.partition_key.keys_by_dimension
+    return keys["date"], keys["channel"]
@@ -0,0 +1,89 @@
+import json
+from typing import Any, Dict, Optional
+
+from dagster import AssetExecutionContext
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+_engine = None
+
+
+def get_engine():
+    """Process-wide engine for the ops tables and advisory locks.
+
+    Built by the loaders' factory, so a plain ``postgresql://`` DATABASE_URL gets the
+    psycopg 3 driver here too.
+    """
+    global _engine
+    if _engine is None:
+        from src.load_detections import get_engine as create_database_engine
+
+        _engine = create_database_engine()
+    return _engine
+
+
+def ensure_stage_runs_table(conn) -> None:
+    conn.execute(text("CREATE SCHEMA IF NOT EXISTS ops"))
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS ops.pipeline_stage_runs (
+                id                BIGSERIAL PRIMARY KEY,
+                recorded_at       TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                run_id            TEXT NOT NULL,
+                stage             TEXT NOT NULL,
+                partition_key     TEXT,
+                duration_seconds  DOUBLE PRECISION,
+                metrics           JSONB NOT NULL
+            )
+            """
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS pipeline_stage_runs_stage_idx "
+            "ON ops.pipeline_stage_runs (stage, recorded_at)"
+        )
+    )
+
+
+def rate(count: float, seconds: float) -> float:
+    return round(count / seconds, 2) if seconds > 0 else 0.0
+
+
+def record_stage_metrics(
+    context: AssetExecutionContext,
+    stage: str,
+    metrics: Dict[str, Any],
+    duration_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Write one stage's figures to ops.pipeline_stage_runs and return them as asset metadata.
+
+    A metrics write that fails is logged, never raised: the stage's own work already succeeded.
+    """
+    metadata = dict(metrics)
+    if duration_seconds is not None:
+        metadata["duration_seconds"] = round(duration_seconds, 3)
+    partition_key = str(context.partition_key) if context.has_partition_key else None
+    try:
+        with get_engine().begin() as conn:
+            ensure_stage_runs_table(conn)
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO ops.pipeline_stage_runs
+                        (run_id, stage, partition_key, duration_seconds, metrics)
+                    VALUES (:run_id, :stage, :partition_key, :duration, CAST(:metrics AS JSONB))
+                    """
+                ),
+                {
+                    "run_id": context.run_id,
+                    "stage": stage,
+                    "partition_key": partition_key,
+                    "duration": duration_seconds,
+                    "metrics": json.dumps(metrics, default=str),
+                },
+            )
+    except SQLAlchemyError as exc:
+        context.log.warning(f"Could not record {stage} metrics in ops.pipeline_stage_runs: {exc}")
+    return metadata
@@ -0,0 +1,12 @@
+{% macro loaded_since_watermark(column='loaded_at', watermark_column='last_loaded_at', relation=this) %}
+    {#- Incremental filter on a loaded_at watermark, re-scanning a lookback window.
+        loaded_at defaults to CURRENT_TIMESTAMP, the start of the loading transaction, so a
+        long load commits rows stamped earlier than ones a concurrent load already
+        committed. Reading from MAX - loaded_at_lookback picks those up; the models'
+        delete+insert unique_key replaces the rows read twice. -#}
+    {{ column }} > (
+        SELECT COALESCE(MAX({{ watermark_column }}), '-infinity'::timestamptz)
+               - INTERVAL '{{ var("loaded_at_lookback", "1 hour") }}'
+        FROM {{ relation }}
+    )
+{%- endmacro %}
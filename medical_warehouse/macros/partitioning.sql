@@ -0,0 +1,65 @@
+{% macro fct_messages_relation() %}
+    {{- return(api.Relation.create(
+        database=target.database,
+        schema=generate_schema_name('marts', none),
+        identifier='fct_messages',
+    )) -}}
+{% endmacro %}
+
+
+{% macro create_partitioned_fct_messages() %}
+    {#- dbt cannot create partitioned tables, so fct_messages is created here, before any
+        model runs, and the model (full_refresh=false) only ever merges into it. The
+        column list must match the model's SELECT. -#}
+    {% set relation = fct_messages_relation() %}
+    {% if execute %}
+        {#- dbt lists the existing relations before on-run-start hooks run. Without this the
+            first run after the table is created here (fresh database, or after
+            src/partition_tables.py) still sees no fct_messages and issues its own CREATE. -#}
+        {% do adapter.cache_added(relation.incorporate(type='table')) %}
+    {% endif %}
+    CREATE SCHEMA IF NOT EXISTS {{ relation.schema }};
+    CREATE TABLE IF NOT EXISTS {{ relation }} (
+        message_id      BIGINT,
+        channel_key     BIGINT,
+        date_key        INTEGER,
+        channel_name    TEXT,
+        message_date    TIMESTAMPTZ NOT NULL,
+        message_text    TEXT,
+        message_length  INTEGER,
+        views           INTEGER,
+        forwards        INTEGER,
+        has_media       BOOLEAN,
+        image_path      TEXT,
+        loaded_at       TIMESTAMPTZ,
+        message_tsv     TSVECTOR
+    ) PARTITION BY RANGE (message_date);
+{% endmacro %}
+
+
+{% macro ensure_month_partitions(relation, source, date_column='message_date', loaded_column='loaded_at') %}
+    {#- Create the monthly partitions of ``relation`` that the source rows loaded since
+        its newest loaded_at (less the lookback window the model re-reads) will land in.
+        Partitions are named <table>_pYYYYMM. -#}
+    DO $$
+    DECLARE
+        month_start DATE;
+    BEGIN
+        FOR month_start IN
+            SELECT DISTINCT DATE(date_trunc('month', {{ date_column }} AT TIME ZONE 'UTC'))
+            FROM {{ source }}
+            WHERE {{ date_column }} IS NOT NULL
+              AND {{ loaded_since_watermark(loaded_column, loaded_column, relation) }}
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I.%I PARTITION OF %I.%I FOR VALUES FROM (%L) TO (%L)',
+                '{{ relation.schema }}',
+                '{{ relation.identifier }}_p' || to_char(month_start, 'YYYYMM'),
+                '{{ relation.schema }}',
+                '{{ relation.identifier }}',
+                month_start::timestamp AT TIME ZONE 'UTC',
+                (month_start + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+        END LOOP;
+    END $$;
+{% endmacro %}
@@ -0,0 +1,22 @@
+{% macro stamp_warehouse_version(results) %}
+    {#- Record a new warehouse version after any run that built models without errors.
+        The API keys its response cache (and ETags) on the latest row. -#}
+    {% if execute %}
+        {% set models = results | selectattr('node.resource_type', 'equalto', 'model') | list %}
+        {% set failed = models | selectattr('status', 'in', ['error', 'fail']) | list %}
+        {% if models and not failed %}
+            {% set stamp_sql %}
+                BEGIN;
+                CREATE SCHEMA IF NOT EXISTS ops;
+                CREATE TABLE IF NOT EXISTS ops.warehouse_version (
+                    version        BIGSERIAL PRIMARY KEY,
+                    completed_at   TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    invocation_id  TEXT
+                );
+                INSERT INTO ops.warehouse_version (invocation_id) VALUES ('{{ invocation_id }}');
+                COMMIT;
+            {% endset %}
+            {% do run_query(stamp_sql) %}
+        {% endif %}
+    {% endif %}
+{% endmacro %}
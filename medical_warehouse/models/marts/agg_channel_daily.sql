@@ -0,0 +1,36 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_key', 'date_key'],
+        post_hook=[
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_channel_date_idx ON {{ this }} (channel_name, date_key)",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_date_idx ON {{ this }} (date_key)",
+        ],
+    )
+}}
+
+-- One row per channel per day. Incremental runs recompute only the (channel, day)
+-- slices that received newly loaded messages and replace them whole.
+SELECT
+    channel_key,
+    date_key,
+    channel_name,
+    DATE(MIN(message_date))                          AS activity_date,
+    COUNT(*)                                         AS message_count,
+    COALESCE(SUM(views), 0)                          AS views_sum,
+    COUNT(views)                                     AS views_count,
+    COALESCE(SUM(forwards), 0)                       AS forwards_sum,
+    SUM(CASE WHEN has_media THEN 1 ELSE 0 END)       AS media_count,
+    MIN(message_date)                                AS first_message_at,
+    MAX(message_date)                                AS last_message_at,
+    MAX(loaded_at)                                   AS last_loaded_at
+FROM {{ ref('fct_messages') }}
+{% if is_incremental() %}
+WHERE (channel_key, date_key) IN (
+    SELECT DISTINCT channel_key, date_key
+    FROM {{ ref('fct_messages') }}
+    WHERE {{ loaded_since_watermark() }}
+)
+{% endif %}
+GROUP BY channel_key, date_key, channel_name
@@ -1,16 +1,34 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='channel_name',
+    )
+}}
 
+-- channel_key is derived from the name rather than numbered, so it stays the same
+-- across incremental runs, new channels and full refreshes. Incremental runs recompute
+-- the channels that received newly loaded messages from all of their messages: the
+-- loaded_at_lookback window re-reads rows already counted, so totals cannot be added to.
 WITH channels AS (
     SELECT
         channel_name,
         MIN(message_date) AS first_post_date,
         MAX(message_date) AS last_post_date,
-        COUNT(*)          AS total_posts
+        COUNT(*)          AS total_posts,
+        MAX(loaded_at)    AS last_loaded_at
     FROM {{ ref('stg_telegram_messages') }}
+    {% if is_incremental() %}
+    WHERE channel_name IN (
+        SELECT DISTINCT channel_name
+        FROM {{ ref('stg_telegram_messages') }}
+        WHERE {{ loaded_since_watermark() }}
+    )
+    {% endif %}
     GROUP BY channel_name
 )
 SELECT
-    ROW_NUMBER() OVER (ORDER BY channel_name) AS channel_key,
+    ('x' || LEFT(MD5(channel_name), 15))::bit(60)::bigint AS channel_key,
     channel_name,
     CASE
         WHEN channel_name ILIKE '%cosmetic%' THEN 'Cosmetics'
@@ -19,5 +37,6 @@ SELECT
     END AS channel_type,
     first_post_date,
     last_post_date,
-    total_posts
+    total_posts,
+    last_loaded_at
 FROM channels
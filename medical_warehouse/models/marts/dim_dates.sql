@@ -1,8 +1,20 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='date_key',
+    )
+}}
 
+-- Incremental runs only rewrite the calendar days that newly loaded messages fall on.
 WITH dates AS (
-    SELECT DISTINCT DATE(message_date) AS full_date
+    SELECT DATE(message_date) AS full_date,
+           MAX(loaded_at)     AS last_loaded_at
     FROM {{ ref('stg_telegram_messages') }}
+    {% if is_incremental() %}
+    WHERE {{ loaded_since_watermark() }}
+    {% endif %}
+    GROUP BY DATE(message_date)
 )
 SELECT
     TO_CHAR(full_date, 'YYYYMMDD')::int            AS date_key,
@@ -12,6 +24,6 @@ SELECT
     TO_CHAR(full_date, 'Month')                    AS month_name,
     EXTRACT(DAY FROM full_date)                    AS day,
     EXTRACT(DOW FROM full_date)                    AS day_of_week,
-    CASE WHEN EXTRACT(DOW FROM full_date) IN (0,6) THEN TRUE ELSE FALSE END AS is_weekend
+    CASE WHEN EXTRACT(DOW FROM full_date) IN (0,6) THEN TRUE ELSE FALSE END AS is_weekend,
+    last_loaded_at
 FROM dates
-ORDER BY full_date
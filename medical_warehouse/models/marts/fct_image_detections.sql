@@ -1,17 +1,65 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_name', 'message_id'],
+        post_hook=[
+            "CREATE UNIQUE INDEX IF NOT EXISTS {{ this.name }}_channel_message_idx ON {{ this }} (channel_name, message_id)",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_date_key_idx ON {{ this }} (date_key)",
+        ],
+    )
+}}
+
+-- raw.yolo_detections keeps one row per model_version; report the latest run per message.
+-- Incremental runs revisit only messages that are new, or whose detections were
+-- (re)loaded, since the newest last_loaded_at already here less the
+-- loaded_at_lookback window.
+{% if is_incremental() %}
+WITH watermark AS (
+    SELECT COALESCE(MAX(last_loaded_at), '-infinity'::timestamptz)
+           - INTERVAL '{{ var("loaded_at_lookback", "1 hour") }}' AS loaded_at
+    FROM {{ this }}
+), changed AS (
+    SELECT channel_name, message_id
+    FROM {{ ref('fct_messages') }}
+    WHERE loaded_at > (SELECT loaded_at FROM watermark)
+    UNION
+    SELECT channel_name, message_id::BIGINT
+    FROM raw.yolo_detections
+    WHERE loaded_at > (SELECT loaded_at FROM watermark)
+), latest_detections AS (
+{% else %}
+WITH latest_detections AS (
+{% endif %}
+    SELECT DISTINCT ON (y.channel_name, y.message_id::BIGINT)
+        y.channel_name,
+        y.message_id::BIGINT AS message_id,
+        y.category,
+        y.max_confidence,
+        y.detections,
+        y.image_path,
+        y.model_version,
+        y.loaded_at
+    FROM raw.yolo_detections y
+    {% if is_incremental() %}
+    JOIN changed ch ON ch.channel_name = y.channel_name AND ch.message_id = y.message_id::BIGINT
+    {% endif %}
+    ORDER BY y.channel_name, y.message_id::BIGINT, y.processed_at DESC NULLS LAST
+)
 
 SELECT
     m.message_id,
-    c.channel_key,
-    d.date_key,
+    m.channel_key,
+    m.channel_name,
+    m.date_key,
     y.category AS image_category,
     y.max_confidence AS confidence_score,
     y.detections,
-    y.image_path
-FROM {{ ref('fct_messages') }} m
-LEFT JOIN {{ ref('dim_channels') }} c ON m.channel_name = c.channel_name
-LEFT JOIN {{ ref('dim_dates') }} d ON DATE(m.message_date) = d.full_date
-LEFT JOIN raw.yolo_detections y
-    ON m.message_id = y.message_id::BIGINT
+    y.image_path,
+    y.model_version,
+    GREATEST(m.loaded_at, y.loaded_at) AS last_loaded_at
+FROM latest_detections y
+JOIN {{ ref('fct_messages') }} m
+    ON m.message_id = y.message_id
     AND m.channel_name = y.channel_name
 WHERE y.category IS NOT NULL
@@ -0,0 +1,42 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_name', 'date_key'],
+        post_hook=[
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_date_key_idx ON {{ this }} (date_key, channel_name)",
+        ],
+    )
+}}
+
+-- Keyword mentions per channel per day. Incremental runs re-tokenize only the
+-- (channel, day) slices that received newly loaded messages; delete+insert on that
+-- key replaces each slice whole, so counts never drift.
+WITH source_messages AS (
+    SELECT channel_name, date_key, message_text, loaded_at
+    FROM {{ ref('fct_messages') }}
+    {% if is_incremental() %}
+    WHERE (channel_name, date_key) IN (
+        SELECT DISTINCT channel_name, date_key
+        FROM {{ ref('fct_messages') }}
+        WHERE {{ loaded_since_watermark() }}
+    )
+    {% endif %}
+), tokens AS (
+    SELECT
+        word[1] AS keyword,
+        sm.channel_name,
+        sm.date_key,
+        sm.loaded_at
+    FROM source_messages sm,
+    LATERAL regexp_matches(lower(COALESCE(sm.message_text, '')), '\y[a-z]{4,}\y', 'g') AS word
+)
+
+SELECT
+    keyword,
+    channel_name,
+    date_key,
+    COUNT(*)       AS mention_count,
+    MAX(loaded_at) AS last_loaded_at
+FROM tokens
+GROUP BY keyword, channel_name, date_key
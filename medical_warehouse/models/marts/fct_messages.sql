@@ -1,5 +1,25 @@
-{{ config(materialized='table') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_name', 'message_id'],
+        full_refresh=false,
+        pre_hook="{{ ensure_month_partitions(this, ref('stg_telegram_messages')) }}",
+        post_hook=[
+            "CREATE UNIQUE INDEX IF NOT EXISTS {{ this.name }}_channel_message_idx ON {{ this }} (channel_name, message_id, message_date)",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_channel_date_idx ON {{ this }} (channel_name, message_date)",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_date_key_idx ON {{ this }} (date_key, channel_name)",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_loaded_at_idx ON {{ this }} (loaded_at)",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_message_tsv_idx ON {{ this }} USING GIN (message_tsv)",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_message_text_trgm_idx ON {{ this }} USING GIN (message_text gin_trgm_ops)",
+        ],
+    )
+}}
 
+-- Monthly range partitions on message_date: the table itself is created by the
+-- create_partitioned_fct_messages on-run-start hook, partitions by the pre-hook.
+-- Incremental runs read only messages loaded since the newest loaded_at already here,
+-- less the loaded_at_lookback window (see loaded_since_watermark).
 SELECT
     m.message_id,
     c.channel_key,
@@ -11,7 +31,13 @@ SELECT
     m.views,
     m.forwards,
     m.has_media,
-    m.image_path
+    m.image_path,
+    m.loaded_at,
+    -- 'simple' config: no stemming or stop words, so Amharic and mixed-script text index as-is
+    to_tsvector('simple', COALESCE(m.message_text, '')) AS message_tsv
 FROM {{ ref('stg_telegram_messages') }} AS m
 JOIN {{ ref('dim_channels') }} AS c ON m.channel_name = c.channel_name
 JOIN {{ ref('dim_dates') }}    AS d ON DATE(m.message_date) = d.full_date
+{% if is_incremental() %}
+WHERE {{ loaded_since_watermark('m.loaded_at', 'loaded_at') }}
+{% endif %}
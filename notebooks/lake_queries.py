@@ -0,0 +1,188 @@
+"""Offline versions of the /reports queries, run with DuckDB over the Parquet lake.
+
+Needs only the files written by src/export_lake.py (no Postgres, no dbt):
+
+    from notebooks.lake_queries import connect, top_products
+    con = connect("data/lake")
+    top_products(con, limit=20, start=date(2024, 1, 1))
+
+Each function mirrors the route of the same name in api/routers/reports.py and returns a
+pandas DataFrame (message_stats returns a dict, or None when nothing matches). Date filters
+are on the ``date=`` partition, so DuckDB only opens the files for the requested days.
+"""
+
+import os
+from datetime import date
+from pathlib import Path
+from typing import Optional, Union
+
+import duckdb
+import pandas as pd
+
+LAKE_DIR = Path(os.getenv("LAKE_DIR", "data/lake"))
+
+
+def _read_parquet(lake_dir: Path, table: str) -> str:
+    pattern = lake_dir / table / "*" / "*" / "*.parquet"
+    if not any(lake_dir.glob(f"{table}/*/*/*.parquet")):
+        raise FileNotFoundError(f"No Parquet files under {lake_dir / table}; run src/export_lake.py first")
+    escaped = str(pattern).replace("'", "''")
+    return f"read_parquet('{escaped}', hive_partitioning = true, union_by_name = true)"
+
+
+def connect(lake_dir: Union[str, Path] = LAKE_DIR, database: str = ":memory:") -> duckdb.DuckDBPyConnection:
+    """Open DuckDB with ``messages`` and ``image_detections`` views over the lake.
+
+    The export only appends, so both views keep the newest copy of each message. Like
+    fct_image_detections, ``image_detections`` holds the latest detection per message
+    (by processed_at), only for messages present in the lake and with a category.
+    """
+    lake_dir = Path(lake_dir)
+    con = duckdb.connect(database)
+    con.execute(
+        f"""
+        CREATE OR REPLACE VIEW messages AS
+        SELECT *
+        FROM {_read_parquet(lake_dir, "telegram_messages")}
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY channel_name, message_id ORDER BY loaded_at DESC) = 1
+        """
+    )
+    con.execute(
+        f"""
+        CREATE OR REPLACE VIEW image_detections AS
+        WITH latest AS (
+            SELECT *
+            FROM {_read_parquet(lake_dir, "yolo_detections")}
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY channel_name, message_id
+                ORDER BY processed_at DESC NULLS LAST, loaded_at DESC
+            ) = 1
+        )
+        SELECT m.channel_name,
+               m.message_id,
+               m.date,
+               m.views,
+               l.category AS image_category,
+               l.max_confidence AS confidence_score,
+               l.model_version
+        FROM latest l
+        JOIN messages m
+          ON m.channel_name = l.channel_name AND m.message_id = l.message_id
+        WHERE l.category IS NOT NULL
+        """
+    )
+    return con
+
+
+def top_products(
+    con: duckdb.DuckDBPyConnection,
+    limit: int = 10,
+    min_count: int = 3,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    channel: Optional[str] = None,
+) -> pd.DataFrame:
+    # Same tokenization as fct_keyword_mentions: lower-cased words of 4+ ASCII letters.
+    return con.execute(
+        r"""
+        WITH tokens AS (
+            SELECT channel_name,
+                   UNNEST(regexp_extract_all(lower(COALESCE(message_text, '')), '\b[a-z]{4,}\b')) AS keyword
+            FROM messages
+            WHERE ($start IS NULL OR date >= CAST($start AS DATE))
+              AND ($end IS NULL OR date <= CAST($end AS DATE))
+              AND ($channel IS NULL OR channel_name = $channel)
+        )
+        SELECT keyword,
+               COUNT(*) AS mention_count,
+               COUNT(DISTINCT channel_name) AS appearing_in_channels
+        FROM tokens
+        GROUP BY keyword
+        HAVING COUNT(*) >= $min_count
+        ORDER BY mention_count DESC
+        LIMIT $limit
+        """,
+        {"start": start, "end": end, "channel": channel, "min_count": min_count, "limit": limit},
+    ).df()
+
+
+def visual_content(con: duckdb.DuckDBPyConnection, limit: int = 10) -> pd.DataFrame:
+    return con.execute(
+        """
+        WITH msg AS (
+            SELECT m.channel_name,
+                   COUNT(*) AS total_messages,
+                   COUNT(d.image_category) AS visual_messages
+            FROM messages m
+            LEFT JOIN image_detections d
+              ON m.message_id = d.message_id AND m.channel_name = d.channel_name
+            GROUP BY m.channel_name
+        ), cat AS (
+            SELECT channel_name,
+                   image_category,
+                   ROW_NUMBER() OVER (PARTITION BY channel_name ORDER BY COUNT(*) DESC) AS rn
+            FROM image_detections
+            GROUP BY channel_name, image_category
+        )
+        SELECT msg.channel_name,
+               msg.total_messages,
+               msg.visual_messages,
+               COALESCE(ROUND(100.0 * msg.visual_messages / NULLIF(msg.total_messages, 0), 1), 0)
+                   AS visual_percentage,
+               cat.image_category AS most_common_category
+        FROM msg
+        LEFT JOIN cat ON cat.channel_name = msg.channel_name AND cat.rn = 1
+        ORDER BY visual_percentage DESC NULLS LAST, msg.total_messages DESC
+        LIMIT $limit
+        """,
+        {"limit": limit},
+    ).df()
+
+
+def message_stats(
+    con: duckdb.DuckDBPyConnection,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Optional[dict]:
+    row = con.execute(
+        """
+        WITH totals AS (
+            SELECT COUNT(*) AS total_messages,
+                   AVG(views) AS avg_views,
+                   AVG(CASE WHEN has_media THEN 1.0 ELSE 0.0 END) AS pct_with_media
+            FROM messages
+            WHERE ($start IS NULL OR date >= CAST($start AS DATE))
+              AND ($end IS NULL OR date <= CAST($end AS DATE))
+        ), detections AS (
+            SELECT COUNT(DISTINCT (channel_name, message_id)) AS detected_messages
+            FROM image_detections
+            WHERE ($start IS NULL OR date >= CAST($start AS DATE))
+              AND ($end IS NULL OR date <= CAST($end AS DATE))
+        )
+        SELECT totals.total_messages,
+               COALESCE(totals.avg_views, 0) AS avg_views,
+               COALESCE(totals.pct_with_media * 100, 0) AS pct_with_media,
+               100.0 * detections.detected_messages / NULLIF(totals.total_messages, 0)
+                   AS pct_with_detected_images
+        FROM totals CROSS JOIN detections
+        """,
+        {"start": start, "end": end},
+    ).fetchone()
+    if not row or not row[0]:
+        return None
+    return dict(zip(["total_messages", "avg_views", "pct_with_media", "pct_with_detected_images"], row))
+
+
+def category_performance(con: duckdb.DuckDBPyConnection, channel: Optional[str] = None) -> pd.DataFrame:
+    return con.execute(
+        """
+        SELECT image_category,
+               COUNT(*) AS message_count,
+               COALESCE(AVG(views), 0) AS avg_views
+        FROM image_detections
+        WHERE ($channel IS NULL OR channel_name = $channel)
+        GROUP BY image_category
+        ORDER BY avg_views DESC NULLS LAST, message_count DESC
+        """,
+        {"channel": channel},
+    ).df()
@@ -1,8 +1,13 @@
+import argparse
+import hashlib
 import json
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import psycopg
 
@@ -16,9 +21,34 @@ DATABASE_URL = os.getenv(
 
 RAW_BASE = Path("data/raw/telegram_messages")
 
+COLUMNS = (
+    "channel_name",
+    "message_id",
+    "message_date",
+    "message_text",
+    "has_media",
+    "image_path",
+    "views",
+    "forwards",
+)
+COLUMN_LIST = ", ".join(COLUMNS)
+PLACEHOLDERS = ", ".join(["%s"] * len(COLUMNS))
+LOAD_MODES = ("insert", "copy")
+# JSONL files are streamed in chunks of this many rows so memory stays flat.
+JSONL_BATCH_SIZE = int(os.getenv("RAW_LOAD_JSONL_BATCH", "5000"))
+STAGE_TABLE = "telegram_messages_stage"
+# raw.telegram_messages is range-partitioned by month on message_date; partitions are
+# created on demand, so the key must be present and part of the primary key.
+CONFLICT_KEY = "channel_name, message_id, message_date"
+DATE_INDEX = COLUMNS.index("message_date")
+PARTITION_LOCK_KEY = 7_301_001
+
+_known_partitions: set = set()
+_partitions_lock = threading.Lock()
+
 
 def ensure_schema_and_table(conn: psycopg.Connection) -> None:
-    """Create raw schema/table with a primary key to de-dupe inserts."""
+    """Create raw schema/table (partitioned by month) with a primary key to de-dupe inserts."""
     with conn.cursor() as cur:
         cur.execute("CREATE SCHEMA IF NOT EXISTS raw;")
         cur.execute(
@@ -26,22 +56,44 @@ def ensure_schema_and_table(conn: psycopg.Connection) -> None:
             CREATE TABLE IF NOT EXISTS raw.telegram_messages (
                 channel_name    TEXT NOT NULL,
                 message_id      BIGINT NOT NULL,
-                message_date    TIMESTAMPTZ,
+                message_date    TIMESTAMPTZ NOT NULL,
                 message_text    TEXT,
                 has_media       BOOLEAN,
                 image_path      TEXT,
                 views           INTEGER,
                 forwards        INTEGER,
                 loaded_at       TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                CONSTRAINT telegram_messages_pk PRIMARY KEY (channel_name, message_id)
+                CONSTRAINT telegram_messages_pk PRIMARY KEY (channel_name, message_id, message_date)
+            ) PARTITION BY RANGE (message_date);
+            """
+        )
+        cur.execute("SELECT relkind FROM pg_class WHERE oid = 'raw.telegram_messages'::regclass")
+        if cur.fetchone()[0] != "p":
+            raise RuntimeError(
+                "raw.telegram_messages is not partitioned; run python src/partition_tables.py first"
+            )
+        # Watermark scans from the incremental dbt models.
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS telegram_messages_loaded_at_idx ON raw.telegram_messages (loaded_at)"
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS raw.load_manifest (
+                file_path       TEXT PRIMARY KEY,
+                file_size       BIGINT NOT NULL,
+                file_mtime_ns   BIGINT NOT NULL,
+                content_hash    TEXT NOT NULL,
+                row_count       INTEGER NOT NULL,
+                inserted_count  INTEGER NOT NULL,
+                loaded_at       TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
             );
             """
         )
         conn.commit()
 
 
-def yield_records(base_dir: Path) -> Iterable[list]:
-    """Yield batches of records from JSON files under data/raw/telegram_messages/YYYY-MM-DD."""
+def iter_json_files(base_dir: Path) -> Iterable[Path]:
+    """Yield JSON/JSONL files under data/raw/telegram_messages/YYYY-MM-DD in date order."""
     if not base_dir.exists():
         logger.warning("Raw data directory does not exist: %s", base_dir)
         return
@@ -49,69 +101,426 @@ def yield_records(base_dir: Path) -> Iterable[list]:
     for date_folder in sorted(base_dir.iterdir()):
         if not date_folder.is_dir():
             continue
-        for json_file in sorted(date_folder.glob("*.json")):
-            logger.info("Processing %s", json_file)
-            try:
-                with json_file.open("r", encoding="utf-8") as f:
-                    messages = json.load(f)
-            except Exception as exc:  # noqa: BLE001
-                logger.error("Failed to read %s: %s", json_file, exc)
-                continue
+        yield from sorted(p for p in date_folder.iterdir() if p.suffix in (".json", ".jsonl"))
 
-            if not messages:
-                continue
 
-            batch = []
-            for msg in messages:
-                batch.append(
-                    (
-                        msg.get("channel_name"),
-                        msg.get("message_id"),
-                        msg.get("message_date"),
-                        msg.get("message_text"),
-                        msg.get("has_media"),
-                        msg.get("image_path"),
-                        msg.get("views"),
-                        msg.get("forwards"),
-                    )
-                )
+def parse_messages(messages: Iterable[dict]) -> list:
+    """Turn scraped message dicts into row tuples ordered like COLUMNS."""
+    return [tuple(msg.get(column) for column in COLUMNS) for msg in messages]
+
+
+def iter_jsonl_batches(path: Path, batch_size: int = JSONL_BATCH_SIZE) -> Iterable[list]:
+    """Stream a scraper JSONL file as row batches without loading it whole.
 
-            if batch:
+    A final line without a newline is a write still in progress (or torn by a crash)
+    and is left for the next run.
+    """
+    batch = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                logger.warning("Ignoring incomplete trailing line in %s", path)
+                break
+            if not line.strip():
+                continue
+            batch.extend(parse_messages([json.loads(line)]))
+            if len(batch) >= batch_size:
                 yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _json_batches(content: bytes) -> Iterable[list]:
+    yield parse_messages(json.loads(content) or [])
+
+
+def read_file(json_file: Path) -> Tuple[str, Iterable[list]]:
+    """Return (content hash, row batches) for a raw JSON or JSONL file.
+
+    Batches are parsed lazily, so a file whose hash matches the manifest is never parsed.
+    """
+    if json_file.suffix == ".jsonl":
+        return file_sha256(json_file), iter_jsonl_batches(json_file)
+    content = json_file.read_bytes()
+    return hashlib.sha256(content).hexdigest(), _json_batches(content)
+
+
+def yield_records(base_dir: Path) -> Iterable[list]:
+    """Yield batches of records from JSON/JSONL files under data/raw/telegram_messages/YYYY-MM-DD."""
+    for json_file in iter_json_files(base_dir):
+        logger.info("Processing %s", json_file)
+        try:
+            _, batches = read_file(json_file)
+            for batch in batches:
+                if batch:
+                    yield batch
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to read %s: %s", json_file, exc)
+            continue
+
+
+def partition_month(value) -> Optional[date]:
+    """First day (UTC) of the month a message_date falls in, or None when it is missing."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"telegram_messages_p{month:%Y%m}"
+
+
+def create_month_partitions(cur: psycopg.Cursor, months: Iterable[date]) -> None:
+    """Create any missing monthly partitions of raw.telegram_messages.
+
+    Creation is serialized with a transaction-level advisory lock, held until the
+    creating file commits, so a parallel worker waits for the partition instead of
+    racing it. Only partitions seen in the catalog are cached.
+    """
+    with _partitions_lock:
+        missing = set(months) - _known_partitions
+    if not missing:
+        return
+    cur.execute("SELECT pg_advisory_xact_lock(%s)", (PARTITION_LOCK_KEY,))
+    cur.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'raw.telegram_messages'::regclass
+        """
+    )
+    existing = {row[0] for row in cur.fetchall()}
+    with _partitions_lock:
+        _known_partitions.update(m for m in missing if partition_name(m) in existing)
+    for month in sorted(m for m in missing if partition_name(m) not in existing):
+        upper = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        cur.execute(
+            f"""
+            CREATE TABLE raw.{partition_name(month)}
+                PARTITION OF raw.telegram_messages
+                FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')
+            """
+        )
+
 
+def forget_partitions() -> None:
+    """Drop the partition cache, e.g. after a rollback undid partitions it had seen."""
+    with _partitions_lock:
+        _known_partitions.clear()
 
-def load_json_to_postgres() -> None:
+
+def prepare_batch(cur: psycopg.Cursor, batch: list) -> list:
+    """Drop rows without a message_date and make sure their month partitions exist."""
+    rows = [row for row in batch if row[DATE_INDEX] is not None]
+    if len(rows) < len(batch):
+        logger.warning("Skipping %s rows without message_date", len(batch) - len(rows))
+    create_month_partitions(cur, {partition_month(row[DATE_INDEX]) for row in rows})
+    return rows
+
+
+def fetch_manifest(conn: psycopg.Connection) -> Dict[str, Tuple[int, int, str]]:
+    """Return {file_path: (size, mtime_ns, content_hash)} for every file already loaded."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT file_path, file_size, file_mtime_ns, content_hash FROM raw.load_manifest")
+        return {row[0]: (row[1], row[2], row[3]) for row in cur.fetchall()}
+
+
+def record_manifest(
+    cur: psycopg.Cursor,
+    file_path: str,
+    size: int,
+    mtime_ns: int,
+    content_hash: str,
+    row_count: Optional[int] = None,
+    inserted_count: Optional[int] = None,
+) -> None:
+    """Upsert a manifest entry; counts are left untouched when not given (stat-only refresh)."""
+    cur.execute(
+        """
+        INSERT INTO raw.load_manifest (
+            file_path, file_size, file_mtime_ns, content_hash, row_count, inserted_count, loaded_at
+        ) VALUES (
+            %(path)s, %(size)s, %(mtime_ns)s, %(hash)s,
+            COALESCE(%(rows)s::int, 0), COALESCE(%(inserted)s::int, 0), CURRENT_TIMESTAMP
+        )
+        ON CONFLICT (file_path) DO UPDATE SET
+            file_size = EXCLUDED.file_size,
+            file_mtime_ns = EXCLUDED.file_mtime_ns,
+            content_hash = EXCLUDED.content_hash,
+            row_count = COALESCE(%(rows)s::int, raw.load_manifest.row_count),
+            inserted_count = COALESCE(%(inserted)s::int, raw.load_manifest.inserted_count),
+            loaded_at = CASE
+                WHEN %(rows)s::int IS NULL THEN raw.load_manifest.loaded_at
+                ELSE CURRENT_TIMESTAMP
+            END
+        """,
+        {
+            "path": file_path,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "hash": content_hash,
+            "rows": row_count,
+            "inserted": inserted_count,
+        },
+    )
+
+
+def insert_batch(cur: psycopg.Cursor, batch: list) -> int:
+    """Insert a batch row by row; returns the number of rows actually inserted."""
+    batch = prepare_batch(cur, batch)
+    if not batch:
+        return 0
+    cur.executemany(
+        f"""
+        INSERT INTO raw.telegram_messages ({COLUMN_LIST})
+        VALUES ({PLACEHOLDERS})
+        ON CONFLICT ({CONFLICT_KEY}) DO NOTHING
+        """,
+        batch,
+    )
+    return max(cur.rowcount, 0)
+
+
+def copy_batch(cur: psycopg.Cursor, batch: list) -> int:
+    """Stream a batch through COPY into a temp stage, then merge with one set-based insert.
+
+    The stage table lives for the whole connection and is emptied before every batch,
+    so a file can be merged in several chunks within one transaction. Returns the
+    number of rows inserted.
+    """
+    batch = prepare_batch(cur, batch)
+    if not batch:
+        return 0
+    cur.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE}
+            (LIKE raw.telegram_messages INCLUDING DEFAULTS)
+            ON COMMIT DELETE ROWS
+        """
+    )
+    cur.execute(f"TRUNCATE {STAGE_TABLE}")
+    with cur.copy(f"COPY {STAGE_TABLE} ({COLUMN_LIST}) FROM STDIN") as copy:
+        for row in batch:
+            copy.write_row(row)
+
+    # DISTINCT ON guards against a file repeating a message; ON CONFLICT keeps
+    # the same first-load-wins semantics as the row-by-row insert path.
+    cur.execute(
+        f"""
+        INSERT INTO raw.telegram_messages ({COLUMN_LIST})
+        SELECT DISTINCT ON ({CONFLICT_KEY}) {COLUMN_LIST}
+        FROM {STAGE_TABLE}
+        ORDER BY {CONFLICT_KEY}
+        ON CONFLICT ({CONFLICT_KEY}) DO NOTHING
+        """
+    )
+    return max(cur.rowcount, 0)
+
+
+def load_file(
+    conn: psycopg.Connection,
+    json_file: Path,
+    known: Optional[Tuple[int, int, str]],
+    write_batch: Callable[[psycopg.Cursor, list], int],
+) -> Dict[str, int]:
+    """Load one JSON/JSONL file in its own transaction and record it in the manifest.
+
+    ``known`` is the file's manifest entry, if any. Returns per-file counts; a failed
+    file is rolled back and reported with ``failed=1`` so it is retried next run.
+    """
+    result = {"loaded": 0, "unchanged": 0, "failed": 0, "rows": 0, "inserted": 0, "bytes": 0}
+    file_key = json_file.relative_to(RAW_BASE).as_posix()
+    stat = json_file.stat()
+    if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+        result["unchanged"] = 1
+        return result
+
+    row_count = 0
     inserted = 0
+    try:
+        with conn.cursor() as cur:
+            content_hash, batches = read_file(json_file)
+            if known and known[2] == content_hash:
+                # Touched but identical: refresh stat so the next run skips without reading.
+                record_manifest(cur, file_key, stat.st_size, stat.st_mtime_ns, content_hash)
+                conn.commit()
+                result["unchanged"] = 1
+                return result
+
+            for batch in batches:
+                if batch:
+                    inserted += write_batch(cur, batch)
+                    row_count += len(batch)
+            record_manifest(
+                cur,
+                file_key,
+                stat.st_size,
+                stat.st_mtime_ns,
+                content_hash,
+                row_count=row_count,
+                inserted_count=inserted,
+            )
+        conn.commit()
+    except Exception as exc:  # noqa: BLE001
+        conn.rollback()
+        forget_partitions()
+        logger.error("Load of %s failed, rolled back: %s", json_file, exc)
+        result["failed"] = 1
+        return result
+
+    result.update(loaded=1, rows=row_count, inserted=inserted, bytes=stat.st_size)
+    return result
+
+
+def _load_files_parallel(
+    files: List[Path],
+    manifest: Dict[str, Tuple[int, int, str]],
+    write_batch: Callable[[psycopg.Cursor, list], int],
+    workers: int,
+) -> Iterable[Tuple[Path, Dict[str, int]]]:
+    """Fan files out to ``workers`` threads, each holding its own connection.
+
+    Results are yielded in input order so progress logs read like a sequential run.
+    """
+    local = threading.local()
+    connections: List[psycopg.Connection] = []
+    connections_lock = threading.Lock()
+
+    def worker_conn() -> psycopg.Connection:
+        if not hasattr(local, "conn"):
+            local.conn = psycopg.connect(DATABASE_URL)
+            with connections_lock:
+                connections.append(local.conn)
+        return local.conn
+
+    def run(json_file: Path) -> Dict[str, int]:
+        known = manifest.get(json_file.relative_to(RAW_BASE).as_posix())
+        return load_file(worker_conn(), json_file, known, write_batch)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="raw-load") as executor:
+            yield from zip(files, executor.map(run, files))
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def load_json_to_postgres(
+    mode: str = "insert",
+    full: bool = False,
+    workers: int = 1,
+    day: Optional[str] = None,
+    channel: Optional[str] = None,
+) -> Dict[str, int]:
+    """Load new or changed raw JSON files into raw.telegram_messages.
+
+    ``mode="insert"`` uses per-row INSERTs, ``mode="copy"`` streams each file through
+    COPY into a staging table and merges it in one statement. Files whose size and mtime
+    (or, failing that, content hash) match raw.load_manifest are skipped unless
+    ``full`` is set. With ``workers > 1`` files are loaded concurrently, one connection
+    and one transaction per file. ``day`` (YYYY-MM-DD folder) and ``channel`` restrict
+    the load to matching files. Returns file and row counts.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode {mode!r}; expected one of {LOAD_MODES}")
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    write_batch = copy_batch if mode == "copy" else insert_batch
+
+    stats = {
+        "files_loaded": 0,
+        "files_unchanged": 0,
+        "files_failed": 0,
+        "inserted": 0,
+        "skipped": 0,
+        "bytes_read": 0,
+    }
     with psycopg.connect(DATABASE_URL) as conn:
         ensure_schema_and_table(conn)
-        with conn.cursor() as cur:
-            for batch in yield_records(RAW_BASE):
-                try:
-                    cur.executemany(
-                        """
-                        INSERT INTO raw.telegram_messages (
-                            channel_name,
-                            message_id,
-                            message_date,
-                            message_text,
-                            has_media,
-                            image_path,
-                            views,
-                            forwards
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (channel_name, message_id) DO NOTHING
-                        """,
-                        batch,
-                    )
-                    inserted += len(batch)
-                    conn.commit()
-                    logger.info("Inserted %s rows (total %s)", len(batch), inserted)
-                except Exception as exc:  # noqa: BLE001
-                    conn.rollback()
-                    logger.error("Insert failed, rolled back: %s", exc)
-
-    logger.info("Finished load. Total inserted: %s", inserted)
+        manifest = {} if full else fetch_manifest(conn)
+        files = [
+            f
+            for f in iter_json_files(RAW_BASE)
+            if (day is None or f.parent.name == day) and (channel is None or f.stem == channel)
+        ]
+
+        if workers == 1:
+            results = (
+                (f, load_file(conn, f, manifest.get(f.relative_to(RAW_BASE).as_posix()), write_batch))
+                for f in files
+            )
+        else:
+            logger.info("Loading %s files with %s workers", len(files), workers)
+            results = _load_files_parallel(files, manifest, write_batch, workers)
+
+        for done, (json_file, result) in enumerate(results, start=1):
+            stats["files_loaded"] += result["loaded"]
+            stats["files_unchanged"] += result["unchanged"]
+            stats["files_failed"] += result["failed"]
+            stats["inserted"] += result["inserted"]
+            stats["skipped"] += result["rows"] - result["inserted"]
+            stats["bytes_read"] += result["bytes"]
+            if result["loaded"]:
+                logger.info(
+                    "[%s/%s] %s: inserted %s rows, skipped %s existing (total inserted %s)",
+                    done,
+                    len(files),
+                    json_file,
+                    result["inserted"],
+                    result["rows"] - result["inserted"],
+                    stats["inserted"],
+                )
+
+    logger.info(
+        "Finished %s load. Files loaded: %s, unchanged: %s, failed: %s. Total inserted: %s, skipped: %s",
+        mode,
+        stats["files_loaded"],
+        stats["files_unchanged"],
+        stats["files_failed"],
+        stats["inserted"],
+        stats["skipped"],
+    )
+    return stats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load raw Telegram JSON into Postgres.")
+    parser.add_argument(
+        "--mode",
+        choices=LOAD_MODES,
+        default=os.getenv("RAW_LOAD_MODE", "insert"),
+        help="insert: per-row INSERT; copy: COPY into a staging table and merge per file",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="ignore raw.load_manifest and re-read every file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("RAW_LOAD_WORKERS", "1")),
+        help="number of parallel loader connections (one file per transaction)",
+    )
+    parser.add_argument("--day", help="only load data/raw/telegram_messages/<YYYY-MM-DD>")
+    parser.add_argument("--channel", help="only load files for this channel")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    load_json_to_postgres()
+    args = parse_args()
+    load_json_to_postgres(mode=args.mode, full=args.full, workers=args.workers, day=args.day, channel=args.channel)
@@ -0,0 +1,168 @@
+import argparse
+import logging
+import os
+
+import psycopg
+
+from load_raw import (
+    COLUMN_LIST,
+    CONFLICT_KEY,
+    DATABASE_URL,
+    create_month_partitions,
+    ensure_schema_and_table,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+MARTS_SCHEMA = os.getenv("DBT_MARTS_SCHEMA", "public_marts")
+OLD_SUFFIX = "_unpartitioned"
+
+
+def relkind(cur: psycopg.Cursor, qualified_name: str):
+    cur.execute(
+        "SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(%s)",
+        (qualified_name,),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def set_aside(cur: psycopg.Cursor, schema: str, table: str) -> str:
+    """Rename a table and its indexes with OLD_SUFFIX so the new table can reuse the names."""
+    cur.execute(
+        """
+        SELECT i.relname
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = to_regclass(%s)
+        """,
+        (f"{schema}.{table}",),
+    )
+    for (index_name,) in cur.fetchall():
+        cur.execute(f'ALTER INDEX "{schema}"."{index_name}" RENAME TO "{index_name}{OLD_SUFFIX}"')
+    old_table = f"{table}{OLD_SUFFIX}"
+    cur.execute(f'ALTER TABLE "{schema}"."{table}" RENAME TO "{old_table}"')
+    return old_table
+
+
+def migrate_raw_messages(conn: psycopg.Connection, drop_old: bool) -> None:
+    """Move raw.telegram_messages into the monthly-partitioned layout, one month per transaction.
+
+    loaded_at is copied as-is so the incremental dbt watermarks are not reset.
+    """
+    with conn.cursor() as cur:
+        kind = relkind(cur, "raw.telegram_messages")
+        if kind != "r":
+            logger.info("raw.telegram_messages is already partitioned (or missing); nothing to move")
+            return
+        # Renaming the primary key index renames its constraint as well.
+        old_table = set_aside(cur, "raw", "telegram_messages")
+    conn.commit()
+    ensure_schema_and_table(conn)
+
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT DISTINCT DATE(date_trunc('month', message_date AT TIME ZONE 'UTC')) AS month
+            FROM raw.{old_table}
+            WHERE message_date IS NOT NULL
+            ORDER BY month
+            """
+        )
+        months = [row[0] for row in cur.fetchall()]
+
+    moved = 0
+    for month in months:
+        with conn.cursor() as cur:
+            create_month_partitions(cur, [month])
+            cur.execute(
+                f"""
+                INSERT INTO raw.telegram_messages ({COLUMN_LIST}, loaded_at)
+                SELECT {COLUMN_LIST}, loaded_at
+                FROM raw.{old_table}
+                WHERE message_date >= (%(month)s::timestamp AT TIME ZONE 'UTC')
+                  AND message_date < ((%(month)s::timestamp + INTERVAL '1 month') AT TIME ZONE 'UTC')
+                ON CONFLICT ({CONFLICT_KEY}) DO NOTHING
+                """,
+                {"month": month},
+            )
+            moved += max(cur.rowcount, 0)
+        conn.commit()
+        logger.info("Moved %s into raw.telegram_messages (total %s rows)", month.strftime("%Y-%m"), moved)
+
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM raw.{old_table} WHERE message_date IS NULL")
+        left_behind = cur.fetchone()[0]
+        if left_behind:
+            logger.warning("%s rows without message_date were not moved (staging drops them anyway)", left_behind)
+        if drop_old:
+            cur.execute(f"DROP TABLE raw.{old_table}")
+            logger.info("Dropped raw.%s", old_table)
+        else:
+            logger.info("Old rows kept in raw.%s; drop it once the new table is verified", old_table)
+    conn.commit()
+
+
+def set_aside_fct_messages(conn: psycopg.Connection, schema: str, drop_old: bool) -> None:
+    """Move the table-materialized fct_messages out of the way.
+
+    The next dbt run creates the partitioned table (on-run-start) and, with an empty
+    target, loads every staging row into it; downstream marts keep their watermarks.
+    """
+    with conn.cursor() as cur:
+        kind = relkind(cur, f"{schema}.fct_messages")
+        if kind != "r":
+            logger.info("%s.fct_messages is already partitioned (or missing); nothing to do", schema)
+            return
+        old_table = set_aside(cur, schema, "fct_messages")
+        if drop_old:
+            cur.execute(f'DROP TABLE "{schema}"."{old_table}"')
+    conn.commit()
+    logger.info("Set aside %s.fct_messages; run dbt to rebuild it partitioned", schema)
+
+
+def drop_partitions_before(conn: psycopg.Connection, schema: str, parent: str, cutoff: str) -> None:
+    """Retention: detach and drop the <parent>_pYYYYMM partitions for months before ``cutoff``."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+              AND c.relname < %s
+            ORDER BY c.relname
+            """,
+            (f"{schema}.{parent}", f"{parent}_p{cutoff.replace('-', '')}"),
+        )
+        for (partition,) in cur.fetchall():
+            cur.execute(f'ALTER TABLE "{schema}"."{parent}" DETACH PARTITION "{schema}"."{partition}"')
+            cur.execute(f'DROP TABLE "{schema}"."{partition}"')
+            logger.info("Dropped %s.%s", schema, partition)
+    conn.commit()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Migrate raw.telegram_messages and fct_messages to monthly partitions."
+    )
+    parser.add_argument("--marts-schema", default=MARTS_SCHEMA, help="schema dbt builds the marts in")
+    parser.add_argument("--drop-old", action="store_true", help="drop the unpartitioned tables after moving")
+    parser.add_argument(
+        "--drop-before",
+        metavar="YYYY-MM",
+        help="retention only: drop raw and fct_messages partitions for months before this one",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with psycopg.connect(DATABASE_URL) as connection:
+        if args.drop_before:
+            drop_partitions_before(connection, "raw", "telegram_messages", args.drop_before)
+            drop_partitions_before(connection, args.marts_schema, "fct_messages", args.drop_before)
+        else:
+            migrate_raw_messages(connection, args.drop_old)
+            set_aside_fct_messages(connection, args.marts_schema, args.drop_old)
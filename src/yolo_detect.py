@@ -1,19 +1,49 @@
 """Run YOLOv8n on raw images and categorize visuals into promotional/product classes."""
+import argparse
+import csv
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+import hashlib
 import logging
+import os
 from pathlib import Path
-from typing import Iterable, List, Set
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-import pandas as pd
+import cv2
+import numpy as np
+import ultralytics
 from ultralytics import YOLO
+from ultralytics.data.augment import LetterBox
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-MODEL = "yolov8n.pt"
+MODEL = os.getenv("YOLO_MODEL", "yolov8n.pt")
+# Cached detections are keyed on this; changing the model (or bumping the override) re-runs every image.
+MODEL_VERSION = os.getenv("YOLO_MODEL_VERSION") or f"{Path(MODEL).name}@ultralytics-{ultralytics.__version__}"
 IMG_DIR = Path("data/raw/images")
 OUTPUT_CSV = Path("data/enriched/yolo_detections.csv")
 OUTPUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+CACHE_DB = Path("data/enriched/yolo_cache.sqlite")
+OUTPUT_COLUMNS = [
+    "image_path",
+    "channel_name",
+    "message_id",
+    "category",
+    "max_confidence",
+    "detections",
+    "processed_at",
+    "image_hash",
+    "model_version",
+]
+
+# Inference tuning: images per forward pass, decode/letterbox threads, torch intra-op threads (0 = torch default).
+IMG_SIZE = 640
+BATCH_SIZE = int(os.getenv("YOLO_BATCH_SIZE", "16"))
+PREFETCH_WORKERS = int(os.getenv("YOLO_PREFETCH_WORKERS", "4"))
+TORCH_THREADS = int(os.getenv("YOLO_TORCH_THREADS", "0"))
 
 PERSON_CLASS = 0
 BOTTLE_CLASS = 39
@@ -42,67 +72,356 @@ def iter_images() -> Iterable[Path]:
             yield img_path
 
 
-def run_detection() -> None:
-    if not IMG_DIR.exists():
-        logger.warning("Image directory %s does not exist", IMG_DIR)
-        return
+def open_cache(path: Path = CACHE_DB) -> sqlite3.Connection:
+    """Open the local detection cache (image index + per-model results)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Partitioned runs can share the cache from several processes; wait out their write locks.
+    cache = sqlite3.connect(path, timeout=60)
+    cache.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS image_index (
+            image_path  TEXT PRIMARY KEY,
+            file_size   INTEGER NOT NULL,
+            mtime_ns    INTEGER NOT NULL,
+            image_hash  TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS detections (
+            image_hash      TEXT NOT NULL,
+            model_version   TEXT NOT NULL,
+            category        TEXT NOT NULL,
+            max_confidence  REAL NOT NULL,
+            detections      TEXT,
+            processed_at    TEXT NOT NULL,
+            PRIMARY KEY (image_hash, model_version)
+        );
+        """
+    )
+    return cache
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
-    model = YOLO(MODEL)
-    logger.info("Loaded %s", MODEL)
+def plan_images(
+    cache: sqlite3.Connection,
+    model_version: str,
+    force: bool = False,
+    images: Optional[Iterable[Path]] = None,
+) -> Tuple[List[Tuple[Path, str]], List[dict]]:
+    """Split images into (path, hash) pairs that need inference and rows reusable from cache.
 
-    results_list: List[dict] = []
+    Unchanged paths (same size and mtime) reuse their indexed hash without being read.
+    A new path whose content was already detected with ``model_version`` is emitted
+    from cache; an unchanged path already detected is skipped entirely. ``images``
+    limits planning to those paths (default: everything under IMG_DIR).
+    """
+    index = {
+        row[0]: (row[1], row[2], row[3])
+        for row in cache.execute("SELECT image_path, file_size, mtime_ns, image_hash FROM image_index")
+    }
+    to_run: List[Tuple[Path, str]] = []
+    reused: List[dict] = []
+    for img_path in iter_images() if images is None else images:
+        if not img_path.is_file():
+            logger.warning("Image %s is missing; skipping", img_path)
+            continue
+        stat = img_path.stat()
+        known = index.get(str(img_path))
+        unchanged = known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns)
+        image_hash = known[2] if unchanged else file_sha256(img_path)
 
-    for img_path in iter_images():
-        try:
-            results = model(img_path, verbose=False)
-        except Exception as exc:  # noqa: BLE001
-            logger.error("Error running model on %s: %s", img_path, exc)
+        cached = None if force else cache.execute(
+            "SELECT category, max_confidence, detections, processed_at FROM detections "
+            "WHERE image_hash = ? AND model_version = ?",
+            (image_hash, model_version),
+        ).fetchone()
+        if cached is None:
+            to_run.append((img_path, image_hash))
             continue
+        if not unchanged:
+            reused.append(make_row(img_path, image_hash, model_version, *cached))
+            remember(cache, img_path, image_hash)
+    cache.commit()
+    return to_run, reused
+
+
+def remember(cache: sqlite3.Connection, img_path: Path, image_hash: str) -> None:
+    stat = img_path.stat()
+    cache.execute(
+        "INSERT OR REPLACE INTO image_index (image_path, file_size, mtime_ns, image_hash) VALUES (?, ?, ?, ?)",
+        (str(img_path), stat.st_size, stat.st_mtime_ns, image_hash),
+    )
+
+
+def make_row(
+    img_path: Path,
+    image_hash: str,
+    model_version: str,
+    category: str,
+    max_conf: float,
+    detections: Optional[str],
+    processed_at: str,
+) -> dict:
+    return {
+        "image_path": str(img_path),
+        "channel_name": img_path.parent.name,
+        "message_id": img_path.stem,
+        "category": category,
+        "max_confidence": max_conf,
+        "detections": detections,
+        "processed_at": processed_at,
+        "image_hash": image_hash,
+        "model_version": model_version,
+    }
+
+
+class CsvOutbox:
+    """Append-only detections CSV, written and flushed one batch at a time.
+
+    A file left with an older column layout is moved aside rather than appended to.
+    """
+
+    def __init__(self, path: Path = OUTPUT_CSV):
+        self.path = path
+        self.rows = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size:
+            with path.open("r", encoding="utf-8", newline="") as f:
+                header = next(csv.reader(f), [])
+            if header != OUTPUT_COLUMNS:
+                legacy = path.with_suffix(".legacy.csv")
+                logger.warning("Moving %s with an old column layout to %s", path, legacy)
+                path.replace(legacy)
+        write_header = not path.exists() or path.stat().st_size == 0
+        self._file = path.open("a", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_COLUMNS)
+        if write_header:
+            self._writer.writeheader()
+
+    def write(self, rows: List[dict]) -> None:
+        self._writer.writerows(rows)
+        self._file.flush()
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def load_image(img_path: Path, letterbox: LetterBox) -> Optional[np.ndarray]:
+    """Decode and letterbox one image (BGR, as YOLO expects); None if unreadable."""
+    img = cv2.imread(str(img_path))
+    if img is None:
+        logger.error("Could not decode %s", img_path)
+        return None
+    return letterbox(image=img)
+
+
+def iter_prefetched_batches(
+    paths: Iterable[Path],
+    batch_size: int,
+    executor: ThreadPoolExecutor,
+    letterbox: LetterBox,
+) -> Iterator[List[Tuple[Path, np.ndarray]]]:
+    """Yield decoded batches while the next batch is already decoding on ``executor``."""
 
-        if not results or not results[0].boxes:
-            category = "other"
-            detections: List[str] = []
-            max_conf = 0.0
-        else:
-            boxes = results[0].boxes
-            cls_ids = boxes.cls.int().tolist()
-            confs = boxes.conf.tolist()
-
-            detected = set(cls_ids)
-            category = categorize(detected)
-
-            detections = []
-            max_conf = 0.0
-            for cls_id, conf in zip(cls_ids, confs):
-                if cls_id in RELEVANT_CLASSES:
-                    class_name = results[0].names[int(cls_id)]
-                    detections.append(f"{class_name}:{conf:.2f}")
-                    max_conf = max(max_conf, float(conf))
-
-        message_id = img_path.stem
-        channel = img_path.parent.name
-
-        results_list.append(
-            {
-                "image_path": str(img_path),
-                "channel_name": channel,
-                "message_id": message_id,
-                "category": category,
-                "max_confidence": max_conf,
-                "detections": "; ".join(detections) if detections else None,
-                "processed_at": datetime.now().isoformat(),
-            }
+    def submit(batch: List[Path]) -> List[Tuple[Path, Future]]:
+        return [(p, executor.submit(load_image, p, letterbox)) for p in batch]
+
+    pending: Optional[List[Tuple[Path, Future]]] = None
+    batch: List[Path] = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) == batch_size:
+            submitted = submit(batch)
+            batch = []
+            if pending is not None:
+                yield [(p, f.result()) for p, f in pending if f.result() is not None]
+            pending = submitted
+    submitted = submit(batch) if batch else None
+    if pending is not None:
+        yield [(p, f.result()) for p, f in pending if f.result() is not None]
+    if submitted:
+        yield [(p, f.result()) for p, f in submitted if f.result() is not None]
+
+
+def summarize(result) -> Tuple[str, List[str], float]:
+    """Return (category, relevant detections, max confidence) for one YOLO result."""
+    if result is None or not result.boxes:
+        return "other", [], 0.0
+
+    boxes = result.boxes
+    cls_ids = boxes.cls.int().tolist()
+    confs = boxes.conf.tolist()
+
+    detected = set(cls_ids)
+    category = categorize(detected)
+
+    detections = []
+    max_conf = 0.0
+    for cls_id, conf in zip(cls_ids, confs):
+        if cls_id in RELEVANT_CLASSES:
+            class_name = result.names[int(cls_id)]
+            detections.append(f"{class_name}:{conf:.2f}")
+            max_conf = max(max_conf, float(conf))
+    return category, detections, max_conf
+
+
+def run_detection(
+    batch_size: int = BATCH_SIZE,
+    prefetch_workers: int = PREFETCH_WORKERS,
+    torch_threads: int = TORCH_THREADS,
+    force: bool = False,
+    images: Optional[Iterable[Path]] = None,
+    output_csv: Path = OUTPUT_CSV,
+) -> Dict[str, float]:
+    """Detect new or changed images and stream their rows to ``output_csv``.
+
+    Results are cached by image content hash and MODEL_VERSION, so only images never
+    seen by the current model are run through YOLO. Rows are appended batch by batch,
+    so memory does not grow with the number of images. The CSV is an outbox: rows
+    accumulate until the loader upserts them into raw.yolo_detections and removes it.
+    ``images`` restricts the run to those paths. Returns counts (images inferred,
+    reused from cache, rows appended) and inference time.
+    """
+    stats = {"inferred": 0, "reused": 0, "rows": 0, "inference_seconds": 0.0}
+    if images is None and not IMG_DIR.exists():
+        logger.warning("Image directory %s does not exist", IMG_DIR)
+        return stats
+
+    cache = open_cache()
+    to_run, reused = plan_images(cache, MODEL_VERSION, force=force, images=images)
+    logger.info(
+        "%d images need inference with %s, %d new paths reused from cache",
+        len(to_run),
+        MODEL_VERSION,
+        len(reused),
+    )
+    if not to_run and not reused:
+        cache.close()
+        logger.info("No new or changed images")
+        return stats
+
+    outbox = CsvOutbox(output_csv)
+    outbox.write(reused)
+    processed = 0
+    started = time.perf_counter()
+    try:
+        if to_run:
+            if torch_threads > 0:
+                import torch
+
+                torch.set_num_threads(torch_threads)
+
+            model = YOLO(MODEL)
+            logger.info("Loaded %s (batch size %s, %s prefetch workers)", MODEL, batch_size, prefetch_workers)
+            letterbox = LetterBox(new_shape=(IMG_SIZE, IMG_SIZE), auto=False)
+            hashes: Dict[Path, str] = dict(to_run)
+
+            with ThreadPoolExecutor(max_workers=max(prefetch_workers, 1), thread_name_prefix="yolo-decode") as executor:
+                for batch in iter_prefetched_batches(hashes, max(batch_size, 1), executor, letterbox):
+                    if not batch:
+                        continue
+                    paths = [p for p, _ in batch]
+                    try:
+                        results = model([img for _, img in batch], imgsz=IMG_SIZE, verbose=False)
+                    except Exception as exc:  # noqa: BLE001
+                        logger.error("Error running model on batch starting at %s: %s", paths[0], exc)
+                        continue
+
+                    rows = []
+                    for img_path, result in zip(paths, results):
+                        category, detections, max_conf = summarize(result)
+                        row = make_row(
+                            img_path,
+                            hashes[img_path],
+                            MODEL_VERSION,
+                            category,
+                            max_conf,
+                            "; ".join(detections) if detections else None,
+                            datetime.now().isoformat(),
+                        )
+                        rows.append(row)
+                        logger.info("%s -> %s (max conf: %.2f)", img_path, category, max_conf)
+
+                    # Outbox first, cache second: a crash in between only means re-detecting the batch.
+                    outbox.write(rows)
+                    for row in rows:
+                        cache.execute(
+                            "INSERT OR REPLACE INTO detections "
+                            "(image_hash, model_version, category, max_confidence, detections, processed_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (
+                                row["image_hash"],
+                                MODEL_VERSION,
+                                row["category"],
+                                row["max_confidence"],
+                                row["detections"],
+                                row["processed_at"],
+                            ),
+                        )
+                        remember(cache, Path(row["image_path"]), row["image_hash"])
+                    cache.commit()
+                    processed += len(rows)
+    finally:
+        outbox.close()
+        cache.close()
+
+    elapsed = time.perf_counter() - started
+    if processed:
+        logger.info(
+            "Processed %d images in %.1fs (%.1f images/s)",
+            processed,
+            elapsed,
+            processed / elapsed if elapsed else 0.0,
         )
+    logger.info("Appended %d results to %s", outbox.rows, output_csv)
+    stats.update(inferred=processed, reused=len(reused), rows=outbox.rows, inference_seconds=elapsed)
+    return stats
 
-        logger.info("%s -> %s (max conf: %.2f)", img_path, category, max_conf)
 
-    if results_list:
-        df = pd.DataFrame(results_list)
-        df.to_csv(OUTPUT_CSV, index=False)
-        logger.info("Saved %d results to %s", len(results_list), OUTPUT_CSV)
-    else:
-        logger.warning("No images processed")
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run YOLO over data/raw/images.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="images per inference call")
+    parser.add_argument(
+        "--prefetch-workers",
+        type=int,
+        default=PREFETCH_WORKERS,
+        help="threads decoding/letterboxing the next batch during inference",
+    )
+    parser.add_argument(
+        "--torch-threads",
+        type=int,
+        default=TORCH_THREADS,
+        help="torch intra-op threads (0 keeps the torch default)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="ignore cached detections and re-run every image",
+    )
+    parser.add_argument(
+        "--no-load",
+        action="store_true",
+        help="only write the CSV; load it later with src/load_detections.py",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    run_detection()
+    args = parse_args()
+    run_detection(
+        batch_size=args.batch_size,
+        prefetch_workers=args.prefetch_workers,
+        torch_threads=args.torch_threads,
+        force=args.force,
+    )
+    if not args.no_load:
+        # Detected images are cached as done, so their rows only reach Postgres through this outbox.
+        from load_detections import get_engine, load_outbox
+
+        load_outbox(get_engine())
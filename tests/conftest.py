@@ -0,0 +1,187 @@
+import os
+import re
+
+# The response cache would look up ops.warehouse_version before every route.
+os.environ.setdefault("API_CACHE_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routers import channels, reports, search
+
+BIND_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+UNTYPED_NULL_CHECK = re.compile(r"(?<![:\w]):\w+\s+IS\s+(NOT\s+)?NULL", re.IGNORECASE)
+
+
+class FakeCopy:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write_row(self, row):
+        self.rows.append(tuple(row))
+
+
+class FakePgCursor:
+    """psycopg cursor double: records statements and COPY rows on its connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = -1
+        self._fetched = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.conn.statements.append((sql, params))
+        self._fetched = next((rows for key, rows in self.conn.results.items() if key in sql), [])
+        self.rowcount = self.conn.rowcount
+
+    def executemany(self, sql, rows):
+        rows = list(rows)
+        self.conn.statements.append((" ".join(sql.split()), rows))
+        self.rowcount = len(rows) if self.conn.rowcount < 0 else self.conn.rowcount
+
+    def copy(self, sql):
+        rows = []
+        self.conn.copies.append((" ".join(sql.split()), rows))
+        return FakeCopy(rows)
+
+    def fetchall(self):
+        return list(self._fetched)
+
+    def fetchone(self):
+        return self._fetched[0] if self._fetched else None
+
+
+class FakePgConnection:
+    """psycopg connection double.
+
+    ``results`` maps a SQL fragment to the rows a statement containing it returns;
+    ``rowcount`` is what every write reports (-1: the number of rows sent).
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.copies = []
+        self.results = {}
+        self.rowcount = -1
+        self.commits = 0
+        self.rollbacks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return FakePgCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+    def executed(self, fragment):
+        return [sql for sql, _ in self.statements if fragment in sql]
+
+
+@pytest.fixture
+def fake_pg(monkeypatch):
+    """Route psycopg.connect to one FakePgConnection."""
+    import psycopg
+
+    conn = FakePgConnection()
+    monkeypatch.setattr(psycopg, "connect", lambda *args, **kwargs: conn)
+    return conn
+
+
+class FakeRow:
+    """Stands in for a SQLAlchemy Row: attribute access plus ``_mapping``."""
+
+    def __init__(self, **values):
+        self._mapping = values
+
+    def __getattr__(self, name):
+        try:
+            return self._mapping[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __iter__(self):
+        return iter(self._mapping.values())
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+def check_bind_params(sql: str, params: dict) -> None:
+    """Fail the way Postgres would on parameters it cannot bind.
+
+    A parameter only compared with NULL has no type for Postgres to infer (``:x IS NULL``
+    raises AmbiguousParameter or DatatypeMismatch under psycopg 3, whatever the value), so
+    optional filters must be left out of the statement instead.
+    """
+    assert not UNTYPED_NULL_CHECK.search(sql), "untyped ':param IS NULL' check"
+    names = set(BIND_PARAM.findall(sql))
+    missing = names - params.keys()
+    assert not missing, f"unbound parameters: {sorted(missing)}"
+    untyped = sorted(name for name in names if params[name] is None)
+    assert not untyped, f"NULL parameters Postgres cannot type: {untyped}"
+
+
+class FakeSession:
+    """AsyncSession double that records statements and returns canned rows."""
+
+    def __init__(self):
+        self.rows = []
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql, params = str(statement), params or {}
+        check_bind_params(sql, params)
+        self.statements.append((sql, params))
+        return FakeResult(self.rows)
+
+
+@pytest.fixture
+def fake_db():
+    session = FakeSession()
+
+    async def override():
+        yield session
+
+    for dependency in (channels.get_channels_db, reports.get_reports_db, search.get_search_db):
+        app.dependency_overrides[dependency] = override
+    yield session
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import cache
+from api.cache import ResponseCacheMiddleware, TTLCache
+
+RESPONSE = (200, "application/json", b"{}")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    backend = TTLCache(max_entries=8, ttl=10)
+
+    async def scenario():
+        await backend.set("key", RESPONSE)
+        clock.now += 9.9
+        hit = await backend.get("key")
+        clock.now += 0.2
+        return hit, await backend.get("key")
+
+    hit, expired = asyncio.run(scenario())
+
+    assert hit == RESPONSE
+    assert expired is None
+    assert "key" not in backend._data
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    backend = TTLCache(max_entries=2, ttl=60)
+
+    async def scenario():
+        await backend.set("a", RESPONSE)
+        await backend.set("b", RESPONSE)
+        await backend.get("a")
+        await backend.set("c", RESPONSE)
+        return [await backend.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [RESPONSE, None, RESPONSE]
+
+
+class FixedVersion:
+    async def current(self):
+        return "7", datetime(2025, 1, 31, 6, 0, tzinfo=timezone.utc)
+
+
+def test_middleware_serves_hits_and_not_modified():
+    calls = []
+    app = FastAPI()
+
+    @app.get("/reports/example")
+    async def example():
+        calls.append(1)
+        return {"ok": True}
+
+    app.add_middleware(ResponseCacheMiddleware, backend=TTLCache(), version=FixedVersion())
+    client = TestClient(app)
+
+    first = client.get("/reports/example")
+    second = client.get("/reports/example")
+    revalidated = client.get("/reports/example", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert second.json() == {"ok": True}
+    assert revalidated.status_code == 304
+    assert first.headers["Last-Modified"] == "Fri, 31 Jan 2025 06:00:00 GMT"
+    assert len(calls) == 1
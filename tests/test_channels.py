@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+from tests.conftest import FakeRow
+
+
+def activity_row(channel_name="CheMed123"):
+    return FakeRow(
+        channel_name=channel_name,
+        total_messages=12,
+        avg_views=150.5,
+        total_images=4,
+        most_recent_message=datetime(2025, 1, 31, 8, 30, tzinfo=timezone.utc),
+    )
+
+
+def test_channel_activity_defaults(client, fake_db):
+    fake_db.rows = [activity_row()]
+
+    response = client.get("/channels/CheMed123/activity")
+
+    assert response.status_code == 200
+    assert response.json()["total_messages"] == 12
+    sql, params = fake_db.statements[-1]
+    assert params == {"channel_name": "CheMed123"}
+    assert "date_key" not in sql
+
+
+def test_channel_activity_date_range(client, fake_db):
+    fake_db.rows = [activity_row()]
+
+    response = client.get("/channels/CheMed123/activity", params={"start": "2025-01-01", "end": "2025-01-31"})
+
+    assert response.status_code == 200
+    sql, params = fake_db.statements[-1]
+    assert params == {"channel_name": "CheMed123", "start_key": 20250101, "end_key": 20250131}
+    assert "date_key >= :start_key" in sql and "date_key <= :end_key" in sql
+
+
+def test_channel_activity_unknown_channel(client, fake_db):
+    assert client.get("/channels/nope/activity").status_code == 404
+
+
+def test_channel_timeseries_defaults(client, fake_db):
+    fake_db.rows = [
+        FakeRow(period_start="2025-01-01", total_messages=3, avg_views=10.0, total_forwards=1, total_images=2)
+    ]
+
+    response = client.get("/channels/CheMed123/timeseries")
+
+    assert response.status_code == 200
+    assert response.json()[0]["total_messages"] == 3
+    _, params = fake_db.statements[-1]
+    assert params == {"channel_name": "CheMed123", "granularity": "day"}
+
+
+def test_channel_timeseries_open_ended_range(client, fake_db):
+    fake_db.rows = [
+        FakeRow(period_start="2025-01-01", total_messages=3, avg_views=10.0, total_forwards=1, total_images=2)
+    ]
+
+    response = client.get("/channels/CheMed123/timeseries", params={"granularity": "month", "start": "2025-01-01"})
+
+    assert response.status_code == 200
+    _, params = fake_db.statements[-1]
+    assert params == {"channel_name": "CheMed123", "granularity": "month", "start_key": 20250101}
+
+
+def test_channels_activity_batch_defaults(client, fake_db):
+    fake_db.rows = [activity_row("CheMed123"), activity_row("lobelia4cosmetics")]
+
+    response = client.get("/channels/activity")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["channel_name"] for r in body["results"]] == ["CheMed123", "lobelia4cosmetics"]
+    assert body["missing"] == []
+    sql, params = fake_db.statements[-1]
+    assert params == {}
+    assert "WHERE TRUE" in sql
+
+
+def test_channels_activity_batch_reports_missing(client, fake_db):
+    fake_db.rows = [activity_row("CheMed123")]
+
+    response = client.get(
+        "/channels/activity",
+        params=[("channels", "CheMed123"), ("channels", "nope"), ("channels", "CheMed123"), ("end", "2025-01-31")],
+    )
+
+    assert response.status_code == 200
+    assert response.json()["missing"] == ["nope"]
+    _, params = fake_db.statements[-1]
+    assert params == {"names": ["CheMed123", "nope"], "end_key": 20250131}
@@ -0,0 +1,100 @@
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from api.routers import export
+from tests.conftest import FakeRow, check_bind_params
+
+
+class FakeStreamResult:
+    def __init__(self, rows, size):
+        self._rows, self._size = rows, size
+
+    async def partitions(self):
+        for index in range(0, len(self._rows), self._size):
+            yield self._rows[index : index + self._size]
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def execute(self, statement, params=None):
+        check_bind_params(str(statement), params or {})
+
+    async def stream(self, statement, params=None):
+        params = params or {}
+        check_bind_params(str(statement), params)
+        self.engine.statements.append((str(statement), params))
+        return FakeStreamResult(self.engine.rows, size=2)
+
+
+class FakeEngine:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    @asynccontextmanager
+    async def connect(self):
+        yield FakeConnection(self)
+
+
+def message_row(message_id):
+    return FakeRow(
+        message_id=message_id,
+        channel_name="CheMed123",
+        message_date=datetime(2025, 1, 10, 9, 0, tzinfo=timezone.utc),
+        message_text="ፓራሲታሞል paracetamol",
+        message_length=20,
+        views=120,
+        forwards=3,
+        has_media=False,
+        image_path=None,
+    )
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    engine = FakeEngine([message_row(i) for i in range(1, 4)])
+    monkeypatch.setattr(export, "engine", engine)
+    return engine
+
+
+def test_export_csv_defaults(client, fake_engine):
+    response = client.get("/export/messages", params={"format": "csv"})
+
+    assert response.status_code == 200
+    lines = response.text.strip().splitlines()
+    assert lines[0] == ",".join(export.EXPORT_COLUMNS)
+    assert len(lines) == 4
+    assert lines[1].startswith("1,CheMed123,2025-01-10T09:00:00+00:00,")
+    sql, params = fake_engine.statements[-1]
+    assert params == {}
+    assert "WHERE TRUE" in sql
+
+
+def test_export_ndjson_defaults(client, fake_engine):
+    response = client.get("/export/messages")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["message_id"] for r in records] == [1, 2, 3]
+    assert records[0]["message_date"] == "2025-01-10T09:00:00Z"
+    assert records[0]["message_text"] == "ፓራሲታሞል paracetamol"
+
+
+def test_export_filters(client, fake_engine):
+    response = client.get(
+        "/export/messages",
+        params={"channel": "CheMed123", "start": "2025-01-01", "end": "2025-01-31"},
+    )
+
+    assert response.status_code == 200
+    _, params = fake_engine.statements[-1]
+    assert params["channel"] == "CheMed123"
+    assert str(params["start"]) == "2025-01-01"
+    # The end date is inclusive: rows before the next midnight.
+    assert str(params["end"]) == "2025-02-01"
@@ -0,0 +1,133 @@
+import csv
+
+import pytest
+
+from src import load_detections
+from tests.conftest import FakePgConnection
+
+
+class FakeScalar:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeSqlConnection:
+    """SQLAlchemy Connection double over one FakePgConnection."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.connection = type("DBAPIConnection", (), {"driver_connection": engine.pg})()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, clause, params=None):
+        sql = " ".join(str(clause).split())
+        self.engine.statements.append((sql, params))
+        return FakeScalar(self.engine.has_key if "yolo_detections_key" in sql else None)
+
+
+class FakeEngine:
+    def __init__(self, has_key=True):
+        self.has_key = has_key
+        self.statements = []
+        self.pg = FakePgConnection()
+
+    def begin(self):
+        return FakeSqlConnection(self)
+
+    def connect(self):
+        return FakeSqlConnection(self)
+
+
+def detection(message_id, detections="bottle(0.90)"):
+    return {
+        "image_path": f"data/raw/images/CheMed123/{message_id}.jpg",
+        "channel_name": "CheMed123",
+        "message_id": str(message_id),
+        "category": "product_display",
+        "max_confidence": "0.9",
+        "detections": detections,
+        "processed_at": "2025-01-10T09:00:00",
+        "image_hash": "abc",
+        "model_version": "yolov8n.pt@test",
+    }
+
+
+def write_outbox(path, rows):
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=load_detections.DETECTION_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def test_load_detections_csv_upserts_in_committed_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(load_detections, "CHUNK_SIZE", 2)
+    path = write_outbox(tmp_path / "out.csv", [detection(1), detection(2, detections=""), detection(3)])
+    engine = FakeEngine()
+
+    loaded = load_detections.load_detections_csv(engine, path)
+
+    assert loaded == 3
+    chunks = [rows for _, rows in engine.pg.copies]
+    assert [[row[2] for row in rows] for rows in chunks] == [["1", "2"], ["3"]]
+    # Empty CSV fields load as NULL.
+    assert chunks[0][1][5] is None
+    upserts = engine.pg.executed("INSERT INTO raw.yolo_detections")
+    assert len(upserts) == 2
+    assert "ON CONFLICT (channel_name, message_id, model_version) DO UPDATE" in upserts[0]
+    # Re-detected rows move the fct_image_detections watermark too.
+    assert "loaded_at = EXCLUDED.loaded_at" in upserts[0]
+    assert engine.pg.commits == 2
+
+
+def test_ensure_detections_table_dedupes_before_adding_the_key():
+    engine = FakeEngine(has_key=False)
+
+    with engine.begin() as conn:
+        load_detections.ensure_detections_table(conn)
+
+    statements = [sql for sql, _ in engine.statements]
+    migration = [s.split()[0] for s in statements[statements.index(next(s for s in statements if "to_regclass" in s)) + 1:]]
+    assert migration == ["UPDATE", "DELETE", "CREATE"]
+    assert "CREATE UNIQUE INDEX IF NOT EXISTS" in statements[-1]
+    # Concurrent loaders queue behind the migration lock, taken before anything else.
+    assert engine.statements[0] == ("SELECT pg_advisory_xact_lock(:key)", {"key": load_detections.SCHEMA_LOCK_KEY})
+
+
+def test_ensure_detections_table_skips_migration_once_keyed():
+    engine = FakeEngine(has_key=True)
+
+    with engine.begin() as conn:
+        load_detections.ensure_detections_table(conn)
+
+    assert not any(sql.startswith(("DELETE", "CREATE UNIQUE")) for sql, _ in engine.statements)
+
+
+def test_load_outbox_removes_the_loaded_csv(tmp_path):
+    path = write_outbox(tmp_path / "out.csv", [detection(1)])
+
+    assert load_detections.load_outbox(FakeEngine(), path) == 1
+    assert not path.exists()
+    assert load_detections.load_outbox(FakeEngine(), path) == 0
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("postgresql://u:p@db:5432/mw", "postgresql+psycopg://u:p@db:5432/mw"),
+        ("postgresql+psycopg://u:p@db:5432/mw", "postgresql+psycopg://u:p@db:5432/mw"),
+    ],
+)
+def test_get_engine_uses_psycopg3(url, expected):
+    engine = load_detections.get_engine(url)
+
+    assert engine.url.render_as_string(hide_password=False) == expected
+    assert engine.dialect.driver == "psycopg"
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+from datetime import date, datetime, timezone
+
+import pytest
+
+from src import load_raw
+
+
+def message(message_id, channel="CheMed123"):
+    return {
+        "message_id": message_id,
+        "channel_name": channel,
+        "message_date": "2025-01-10T09:00:00+00:00",
+        "message_text": "paracetamol",
+        "has_media": False,
+        "image_path": None,
+        "views": 10,
+        "forwards": 1,
+    }
+
+
+def row(message_id, channel="CheMed123"):
+    """``message`` as the row tuple load_raw writes, ordered like COLUMNS."""
+    return (channel, message_id, "2025-01-10T09:00:00+00:00", "paracetamol", False, None, 10, 1)
+
+
+def write_day(base, day, channel, messages):
+    path = base / day / f"{channel}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(messages), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def raw_base(tmp_path, monkeypatch, fake_pg):
+    monkeypatch.setattr(load_raw, "RAW_BASE", tmp_path)
+    # raw.telegram_messages is already partitioned; month partitions are created per test.
+    fake_pg.results["FROM pg_class WHERE"] = [("p",)]
+    load_raw.forget_partitions()
+    return tmp_path
+
+
+def test_copy_mode_stages_each_file_and_merges_once(raw_base, fake_pg):
+    write_day(raw_base, "2025-01-10", "CheMed123", [message(1), message(2)])
+    write_day(raw_base, "2025-01-11", "CheMed123", [message(3)])
+    fake_pg.rowcount = 1
+
+    stats = load_raw.load_json_to_postgres(mode="copy")
+
+    assert [rows for _, rows in fake_pg.copies] == [[row(1), row(2)], [row(3)]]
+    merges = fake_pg.executed(f"FROM {load_raw.STAGE_TABLE}")
+    assert len(merges) == 2
+    assert f"ON CONFLICT ({load_raw.CONFLICT_KEY}) DO NOTHING" in merges[0]
+    assert (stats["inserted"], stats["skipped"]) == (2, 1)
+    # The fake catalog lists no partitions, so January's is created before each COPY.
+    partitions = fake_pg.executed("PARTITION OF raw.telegram_messages")
+    assert partitions and all("raw.telegram_messages_p202501" in sql for sql in partitions)
+
+
+def test_insert_mode_inserts_row_by_row(raw_base, fake_pg):
+    write_day(raw_base, "2025-01-10", "CheMed123", [message(1), message(2)])
+    fake_pg.rowcount = 1
+
+    stats = load_raw.load_json_to_postgres(mode="insert")
+
+    inserts = [rows for sql, rows in fake_pg.statements if sql.startswith("INSERT INTO raw.telegram_messages")]
+    assert inserts == [[row(1), row(2)]]
+    assert (stats["inserted"], stats["skipped"]) == (1, 1)
+    assert not fake_pg.copies
+
+
+def manifest_entry(path, base, **overrides):
+    stat = path.stat()
+    entry = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": hashlib.sha256(path.read_bytes()).hexdigest(),
+    }
+    entry.update(overrides)
+    return (path.relative_to(base).as_posix(), entry["size"], entry["mtime_ns"], entry["hash"])
+
+
+def manifest_writes(conn):
+    return [params for sql, params in conn.statements if sql.startswith("INSERT INTO raw.load_manifest")]
+
+
+def test_manifest_skips_files_with_matching_size_and_mtime(raw_base, fake_pg):
+    path = write_day(raw_base, "2025-01-10", "CheMed123", [message(1)])
+    fake_pg.results["FROM raw.load_manifest"] = [manifest_entry(path, raw_base)]
+
+    stats = load_raw.load_json_to_postgres(mode="copy")
+
+    assert (stats["files_loaded"], stats["files_unchanged"]) == (0, 1)
+    assert not fake_pg.copies
+    assert not manifest_writes(fake_pg)
+
+
+def test_manifest_refreshes_stat_of_touched_identical_file(raw_base, fake_pg):
+    path = write_day(raw_base, "2025-01-10", "CheMed123", [message(1)])
+    fake_pg.results["FROM raw.load_manifest"] = [manifest_entry(path, raw_base, mtime_ns=1)]
+
+    stats = load_raw.load_json_to_postgres(mode="copy")
+
+    assert (stats["files_loaded"], stats["files_unchanged"]) == (0, 1)
+    assert not fake_pg.copies
+    (written,) = manifest_writes(fake_pg)
+    assert written["mtime_ns"] == path.stat().st_mtime_ns
+    assert written["rows"] is None
+
+
+def test_manifest_hash_match_skips_parsing(raw_base, fake_pg, monkeypatch):
+    path = write_day(raw_base, "2025-01-10", "CheMed123", [message(1)])
+    fake_pg.results["FROM raw.load_manifest"] = [manifest_entry(path, raw_base, mtime_ns=1)]
+
+    def fail_parse(messages):
+        raise AssertionError("an unchanged file was parsed")
+
+    monkeypatch.setattr(load_raw, "parse_messages", fail_parse)
+
+    stats = load_raw.load_json_to_postgres(mode="copy")
+
+    assert (stats["files_unchanged"], stats["files_failed"]) == (1, 0)
+
+
+def test_manifest_reloads_changed_file_and_records_counts(raw_base, fake_pg):
+    path = write_day(raw_base, "2025-01-10", "CheMed123", [message(1)])
+    fake_pg.results["FROM raw.load_manifest"] = [manifest_entry(path, raw_base)]
+    write_day(raw_base, "2025-01-10", "CheMed123", [message(1), message(2)])
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    fake_pg.rowcount = 1
+
+    stats = load_raw.load_json_to_postgres(mode="copy")
+
+    assert (stats["files_loaded"], stats["inserted"], stats["skipped"]) == (1, 1, 1)
+    assert [rows for _, rows in fake_pg.copies] == [[row(1), row(2)]]
+    (written,) = manifest_writes(fake_pg)
+    assert (written["rows"], written["inserted"]) == (2, 1)
+    assert written["hash"] == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_full_load_ignores_manifest(raw_base, fake_pg):
+    path = write_day(raw_base, "2025-01-10", "CheMed123", [message(1)])
+    fake_pg.results["FROM raw.load_manifest"] = [manifest_entry(path, raw_base)]
+
+    stats = load_raw.load_json_to_postgres(mode="copy", full=True)
+
+    assert stats["files_loaded"] == 1
+    assert not fake_pg.executed("FROM raw.load_manifest")
+
+
+def write_jsonl(path, messages, tail=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(m) + "\n" for m in messages) + tail, encoding="utf-8")
+    return path
+
+
+def test_iter_jsonl_batches_streams_fixed_size_batches(tmp_path):
+    path = write_jsonl(tmp_path / "CheMed123.jsonl", [message(i) for i in range(1, 6)])
+
+    batches = list(load_raw.iter_jsonl_batches(path, batch_size=2))
+
+    assert batches == [[row(1), row(2)], [row(3), row(4)], [row(5)]]
+
+
+def test_iter_jsonl_batches_leaves_incomplete_tail(tmp_path):
+    path = write_jsonl(tmp_path / "CheMed123.jsonl", [message(1)], tail='\n{"message_id": 2, "chan')
+
+    assert list(load_raw.iter_jsonl_batches(path)) == [[row(1)]]
+
+
+def test_jsonl_files_are_loaded_alongside_json(raw_base, fake_pg):
+    write_day(raw_base, "2025-01-10", "CheMed123", [message(1)])
+    write_jsonl(raw_base / "2025-01-10" / "lobelia4cosmetics.jsonl", [message(7, "lobelia4cosmetics")])
+
+    stats = load_raw.load_json_to_postgres(mode="copy")
+
+    assert stats["files_loaded"] == 2
+    assert [rows for _, rows in fake_pg.copies] == [[row(1)], [row(7, "lobelia4cosmetics")]]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        load_raw.load_json_to_postgres(mode="bulk")
+
+
+@pytest.mark.parametrize(
+    "value, month",
+    [
+        ("2025-01-01T00:00:00+00:00", date(2025, 1, 1)),
+        ("2025-01-31T23:59:59.999999+00:00", date(2025, 1, 1)),
+        ("2025-02-01T00:00:00Z", date(2025, 2, 1)),
+        # Partitions are bounded in UTC: local midnight on 1 Feb is still January.
+        ("2025-02-01T01:00:00+03:00", date(2025, 1, 1)),
+        ("2024-12-31T22:30:00-02:00", date(2025, 1, 1)),
+        (datetime(2024, 2, 29, 12, 0, tzinfo=timezone.utc), date(2024, 2, 1)),
+        (datetime(2025, 3, 1, 0, 0), date(2025, 3, 1)),
+    ],
+)
+def test_partition_month_bounds(value, month):
+    assert load_raw.partition_month(value) == month
+
+
+def test_partition_month_missing_date():
+    assert load_raw.partition_month(None) is None
+
+
+def test_partition_name():
+    assert load_raw.partition_name(date(2025, 1, 1)) == "telegram_messages_p202501"
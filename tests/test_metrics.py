@@ -0,0 +1,56 @@
+from api.metrics import Counter, Histogram
+from tests.conftest import FakeRow
+
+
+def test_counter_render_escapes_labels():
+    counter = Counter("test_total", "Test counter.")
+    counter.inc(route="/a", status="200")
+    counter.inc(2, route="/a", status="200")
+    counter.inc(route='say "hi"\n', status="500")
+
+    assert counter.render() == [
+        "# HELP test_total Test counter.",
+        "# TYPE test_total counter",
+        'test_total{route="/a",status="200"} 3',
+        'test_total{route="say \\"hi\\"\\n",status="500"} 1',
+    ]
+
+
+def test_histogram_render_is_cumulative():
+    histogram = Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/a")
+
+    assert histogram.render() == [
+        "# HELP test_seconds Test histogram.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1"} 3',
+        'test_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_seconds_sum{route="/a"} 3.65',
+        'test_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_metrics_endpoint_reports_routes_and_pool(client, fake_db):
+    fake_db.rows = [FakeRow(image_category="promotional", message_count=7, avg_views=120.0)]
+    assert client.get("/reports/category-performance").status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert any(
+        line.startswith('api_requests_total{method="GET",route="/reports/category-performance",status="200"} ')
+        for line in lines
+    )
+    assert any(
+        line.startswith('api_request_duration_seconds_count{method="GET",route="/reports/category-performance"} ')
+        for line in lines
+    )
+    assert "# TYPE api_db_pool_size gauge" in lines
+
+
+def test_health(client):
+    assert client.get("/health").json() == {"status": "ok"}
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from api.pagination import (
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_datetime,
+    parse_cursor_float,
+    parse_cursor_int,
+    parse_cursor_str,
+)
+
+
+def test_cursor_round_trip():
+    message_date = datetime(2025, 1, 10, 9, 0, tzinfo=timezone.utc)
+
+    cursor = encode_cursor([0.25, message_date, 1234])
+
+    assert "=" not in cursor
+    rank, date_value, message_id = decode_cursor(cursor, 3)
+    assert (rank, message_id) == (0.25, 1234)
+    assert parse_cursor_datetime(date_value) == message_date
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(["??>>~~" * 5])
+
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+    assert decode_cursor(cursor, 1) == ["??>>~~" * 5]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", "Ingi", "e30"])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor, 1)
+    assert excinfo.value.status_code == 400
+
+
+def test_decode_cursor_rejects_wrong_size():
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(encode_cursor([1, 2]), 3)
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.parametrize("value", [None, 12, "yesterday"])
+def test_parse_cursor_datetime_rejects_non_dates(value):
+    with pytest.raises(HTTPException) as excinfo:
+        parse_cursor_datetime(value)
+    assert excinfo.value.status_code == 400
+
+
+def test_parse_cursor_scalars():
+    assert parse_cursor_int(12) == 12
+    assert parse_cursor_float(1) == 1.0
+    assert parse_cursor_str("CheMed123") == "CheMed123"
+
+
+@pytest.mark.parametrize(
+    "parse, value",
+    [
+        (parse_cursor_int, True),
+        (parse_cursor_int, 1.0),
+        (parse_cursor_int, "1"),
+        (parse_cursor_float, False),
+        (parse_cursor_float, None),
+        (parse_cursor_str, 1),
+    ],
+)
+def test_parse_cursor_scalars_reject_wrong_types(parse, value):
+    with pytest.raises(HTTPException) as excinfo:
+        parse(value)
+    assert excinfo.value.status_code == 400
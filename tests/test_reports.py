@@ -0,0 +1,95 @@
+from tests.conftest import FakeRow
+
+
+def test_message_stats_defaults(client, fake_db):
+    fake_db.rows = [FakeRow(total_messages=100, avg_views=42.0, pct_with_media=35.0, pct_with_detected_images=20.0)]
+
+    response = client.get("/reports/message-stats")
+
+    assert response.status_code == 200
+    assert response.json()["total_messages"] == 100
+    sql, params = fake_db.statements[-1]
+    assert params == {}
+    assert "start_key" not in sql
+
+
+def test_message_stats_date_range(client, fake_db):
+    fake_db.rows = [FakeRow(total_messages=100, avg_views=42.0, pct_with_media=35.0, pct_with_detected_images=20.0)]
+
+    response = client.get("/reports/message-stats", params={"start": "2025-01-01", "end": "2025-01-31"})
+
+    assert response.status_code == 200
+    _, params = fake_db.statements[-1]
+    assert params == {"start_key": 20250101, "end_key": 20250131}
+
+
+def test_message_stats_empty_warehouse(client, fake_db):
+    fake_db.rows = [FakeRow(total_messages=None, avg_views=0, pct_with_media=0, pct_with_detected_images=None)]
+
+    assert client.get("/reports/message-stats").status_code == 404
+
+
+def test_top_products_defaults(client, fake_db):
+    fake_db.rows = [FakeRow(keyword="paracetamol", mention_count=40, appearing_in_channels=3)]
+
+    response = client.get("/reports/top-products")
+
+    assert response.status_code == 200
+    assert response.json() == [{"keyword": "paracetamol", "mention_count": 40, "appearing_in_channels": 3}]
+    sql, params = fake_db.statements[-1]
+    assert params == {"min_count": 3, "limit": 10}
+    assert "WHERE TRUE" in sql
+
+
+def test_top_products_all_filters(client, fake_db):
+    fake_db.rows = [FakeRow(keyword="paracetamol", mention_count=40, appearing_in_channels=1)]
+
+    response = client.get(
+        "/reports/top-products",
+        params={"limit": 5, "start": "2025-01-01", "end": "2025-01-31", "channel": "CheMed123"},
+    )
+
+    assert response.status_code == 200
+    _, params = fake_db.statements[-1]
+    assert params == {
+        "min_count": 3,
+        "limit": 5,
+        "start_key": 20250101,
+        "end_key": 20250131,
+        "channel": "CheMed123",
+    }
+
+
+def test_visual_content_defaults(client, fake_db):
+    fake_db.rows = [
+        FakeRow(
+            channel_name="CheMed123",
+            total_messages=10,
+            visual_messages=4,
+            visual_percentage=40.0,
+            most_common_category="product_display",
+        )
+    ]
+
+    response = client.get("/reports/visual-content")
+
+    assert response.status_code == 200
+    assert response.json()[0]["visual_percentage"] == 40.0
+    assert fake_db.statements[-1][1] == {"limit": 10}
+
+
+def test_category_performance_defaults(client, fake_db):
+    fake_db.rows = [FakeRow(image_category="promotional", message_count=7, avg_views=120.0)]
+
+    response = client.get("/reports/category-performance")
+
+    assert response.status_code == 200
+    assert response.json() == [{"image_category": "promotional", "avg_views": 120.0, "message_count": 7}]
+    assert fake_db.statements[-1][1] == {}
+
+
+def test_category_performance_channel(client, fake_db):
+    fake_db.rows = [FakeRow(image_category="promotional", message_count=7, avg_views=120.0)]
+
+    assert client.get("/reports/category-performance", params={"channel": "CheMed123"}).status_code == 200
+    assert fake_db.statements[-1][1] == {"channel": "CheMed123"}
@@ -0,0 +1,255 @@
+import asyncio
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+from telethon.errors import FloodWaitError
+
+from src import scraper
+
+
+def test_token_bucket_bursts_then_refills():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        bucket = scraper.TokenBucket(rate=20, capacity=3)
+        start = loop.time()
+        for _ in range(3):
+            await bucket.acquire()
+        burst = loop.time() - start
+        await bucket.acquire()
+        return burst, loop.time() - start
+
+    burst, refill = asyncio.run(scenario())
+
+    assert burst < 0.04
+    assert refill >= 0.045
+
+
+def test_token_bucket_pause_blocks_and_empties_bucket():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        bucket = scraper.TokenBucket(rate=20, capacity=5)
+        start = loop.time()
+        bucket.pause(0.1)
+        await bucket.acquire()
+        resumed = loop.time() - start
+        # No burst after a pause: the next token takes a full 1/rate.
+        await bucket.acquire()
+        return resumed, loop.time() - start
+
+    resumed, second = asyncio.run(scenario())
+
+    assert resumed >= 0.1
+    assert second >= 0.145
+
+
+@pytest.mark.parametrize("rate, capacity", [(0, 1), (-1, 1), (1, 0)])
+def test_token_bucket_rejects_bad_settings(rate, capacity):
+    with pytest.raises(ValueError):
+        scraper.TokenBucket(rate=rate, capacity=capacity)
+
+
+def jsonl_line(message_id):
+    return json.dumps({"message_id": message_id, "message_text": "x"}) + "\n"
+
+
+def test_jsonl_writer_truncates_torn_tail(tmp_path):
+    path = tmp_path / "CheMed123.jsonl"
+    good = jsonl_line(7) + jsonl_line(5)
+    path.write_text(good + '{"message_id": 4, "message_te', encoding="utf-8")
+
+    writer = scraper.JsonlWriter(path)
+    assert (writer.count, writer.max_message_id, writer.last_message_id) == (2, 7, 5)
+    assert path.read_text(encoding="utf-8") == good
+
+    writer.write_page([{"message_id": 4, "message_text": "x"}])
+    writer.close()
+    assert path.read_text(encoding="utf-8") == good + jsonl_line(4)
+
+
+def test_jsonl_writer_stops_at_a_corrupt_line(tmp_path):
+    path = tmp_path / "CheMed123.jsonl"
+    path.write_text(jsonl_line(9) + "not json\n" + jsonl_line(8), encoding="utf-8")
+
+    writer = scraper.JsonlWriter(path)
+    writer.close()
+
+    assert (writer.count, writer.last_message_id) == (1, 9)
+    assert path.read_text(encoding="utf-8") == jsonl_line(9)
+
+
+def test_jsonl_writer_new_file(tmp_path):
+    writer = scraper.JsonlWriter(tmp_path / "day" / "CheMed123.jsonl")
+    writer.close()
+
+    assert (writer.count, writer.max_message_id, writer.last_message_id) == (0, 0, None)
+
+
+
+def test_save_resume_replaces_the_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper, "RESUME_DIR", tmp_path)
+
+    scraper.save_resume("CheMed123", {"path": "a.jsonl", "min_id": 1, "days_back": 1})
+    scraper.save_resume("CheMed123", {"path": "a.jsonl", "min_id": 2, "days_back": 1})
+
+    assert scraper.load_resume("CheMed123")["min_id"] == 2
+    assert [p.name for p in tmp_path.iterdir()] == ["CheMed123.json"]
+
+
+@pytest.mark.parametrize("content", ['{"path": "a.jsonl", "min_', "[]"])
+def test_load_resume_ignores_a_corrupt_checkpoint(tmp_path, monkeypatch, content):
+    monkeypatch.setattr(scraper, "RESUME_DIR", tmp_path)
+    (tmp_path / "CheMed123.json").write_text(content, encoding="utf-8")
+
+    assert scraper.load_resume("CheMed123") is None
+
+
+class FakeTelegramClient:
+    def __init__(self, *args):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def is_user_authorized(self):
+        return True
+
+
+def test_scrape_channel_day_leaves_the_watermark_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, "TelegramClient", FakeTelegramClient)
+    scraper.save_watermark("CheMed123", 100)
+    day = date(2025, 1, 10)
+
+    async def fake_scrape(client, channel, max_messages, since, until):
+        assert (since.date(), until.date()) == (day, date(2025, 1, 11))
+        return [{"message_id": 500, "channel_name": channel, "has_media": True, "image_path": "500.jpg"}]
+
+    monkeypatch.setattr(scraper, "scrape_channel", fake_scrape)
+
+    stats = asyncio.run(scraper.scrape_channel_day("CheMed123", day))
+
+    path = stats["path"]
+    assert (stats["messages"], stats["media_messages"], stats["images"]) == (1, 1, 1)
+    assert path == Path("data/raw/telegram_messages/2025-01-10/CheMed123.json")
+    assert json.loads(path.read_text(encoding="utf-8"))[0]["message_id"] == 500
+    # Days between the watermark and this partition may not be scraped yet.
+    assert scraper.load_watermarks("file") == {"CheMed123": 100}
+
+
+class FakeMessage:
+    id = 42
+
+
+class NoLimit:
+    """TokenBucket double: never waits, records pauses."""
+
+    def __init__(self):
+        self.pauses = []
+
+    async def acquire(self):
+        pass
+
+    def pause(self, seconds):
+        self.pauses.append(seconds)
+
+
+class FakeClient:
+    """download_media replays ``outcomes``: an exception to raise, or bytes to write."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.targets = []
+
+    async def download_media(self, msg, file):
+        self.targets.append(file)
+        outcome = self.outcomes.pop(0)
+        with open(file, "wb") as f:
+            f.write(b"partial" if isinstance(outcome, Exception) else outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return file
+
+
+def run_download(client, img_path, limiter, **worker_options):
+    async def go():
+        queue = asyncio.Queue()
+        msg_data = {"image_path": None}
+        done = asyncio.get_running_loop().create_future()
+        queue.put_nowait((FakeMessage(), img_path, msg_data, done))
+        worker = asyncio.create_task(scraper.download_worker(client, queue, limiter, **worker_options))
+        await done
+        worker.cancel()
+        return msg_data
+
+    return asyncio.run(go())
+
+
+async def no_sleep(seconds):
+    pass
+
+
+def test_download_worker_renames_complete_download(tmp_path):
+    img_path = tmp_path / "42.jpg"
+    client = FakeClient(b"jpeg")
+
+    msg_data = run_download(client, img_path, NoLimit(), retries=1)
+
+    assert client.targets == [str(tmp_path / "42.part")]
+    assert img_path.read_bytes() == b"jpeg"
+    assert msg_data["image_path"] == str(img_path)
+    assert not (tmp_path / "42.part").exists()
+
+
+def test_download_worker_failure_leaves_no_image(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper.asyncio, "sleep", no_sleep)
+    img_path = tmp_path / "42.jpg"
+
+    msg_data = run_download(FakeClient(OSError("connection reset")), img_path, NoLimit(), retries=1)
+
+    assert msg_data["image_path"] is None
+    assert not img_path.exists()
+    assert not (tmp_path / "42.part").exists()
+
+
+def test_download_worker_flood_wait_does_not_use_a_retry(tmp_path, monkeypatch):
+    slept = []
+
+    async def record_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(scraper.asyncio, "sleep", record_sleep)
+    limiter = NoLimit()
+    flood = FloodWaitError(request=None, capture=30)
+    client = FakeClient(flood, flood, b"jpeg")
+
+    msg_data = run_download(client, tmp_path / "42.jpg", limiter, retries=1)
+
+    assert msg_data["image_path"] == str(tmp_path / "42.jpg")
+    assert limiter.pauses == [35, 35]
+    assert slept == [30, 30]
+
+
+def test_download_worker_skips_image_after_flood_wait_budget(tmp_path, monkeypatch):
+    slept = []
+
+    async def record_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(scraper.asyncio, "sleep", record_sleep)
+    limiter = NoLimit()
+    flood = FloodWaitError(request=None, capture=30)
+    client = FakeClient(flood, flood, flood, b"jpeg")
+
+    msg_data = run_download(client, tmp_path / "42.jpg", limiter, retries=1, flood_wait_max=60)
+
+    assert msg_data["image_path"] is None
+    assert not (tmp_path / "42.jpg").exists()
+    # The third wait would exceed the budget: the limiter still pauses, the worker moves on.
+    assert slept == [30, 30]
+    assert limiter.pauses == [35, 35, 35]
+    assert len(client.outcomes) == 1
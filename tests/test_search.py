@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from api.pagination import decode_cursor, encode_cursor
+from tests.conftest import FakeRow
+
+
+def preview_row(message_id, rank=0.5):
+    return FakeRow(
+        message_id=message_id,
+        channel_name="CheMed123",
+        message_date=datetime(2025, 1, 10, 9, 0, tzinfo=timezone.utc),
+        message_text="paracetamol 500mg available",
+        views=120,
+        has_media=False,
+        image_category=None,
+        rank=rank,
+        snippet="<mark>paracetamol</mark> 500mg available",
+    )
+
+
+def test_search_defaults(client, fake_db):
+    fake_db.rows = [preview_row(1)]
+
+    response = client.get("/search/messages", params={"query": "paracetamol"})
+
+    assert response.status_code == 200
+    assert response.json()[0]["message_id"] == 1
+    assert "X-Next-Cursor" not in response.headers
+    sql, params = fake_db.statements[-1]
+    assert params == {"q": "paracetamol", "limit": 20}
+    assert ":channel" not in sql
+
+
+def test_search_channel_and_next_page(client, fake_db):
+    fake_db.rows = [preview_row(2, rank=0.9), preview_row(1, rank=0.4)]
+
+    first = client.get("/search/messages", params={"query": "paracetamol", "channel": "CheMed123", "limit": 2})
+
+    assert first.status_code == 200
+    sql, params = fake_db.statements[-1]
+    assert params["channel"] == "CheMed123"
+    assert "m.channel_name = :channel" in sql
+    cursor = first.headers["X-Next-Cursor"]
+    assert decode_cursor(cursor, 4) == [0.4, "2025-01-10T09:00:00+00:00", "CheMed123", 1]
+
+    fake_db.rows = []
+    second = client.get("/search/messages", params={"query": "paracetamol", "limit": 2, "cursor": cursor})
+
+    assert second.status_code == 200
+    assert second.json() == []
+    sql, params = fake_db.statements[-1]
+    assert params["after_message_id"] == 1
+    assert "WHERE (rank, message_date, channel_name, message_id) <" in sql
+
+
+def test_search_no_matches(client, fake_db):
+    assert client.get("/search/messages", params={"query": "nothing"}).status_code == 404
+
+
+def test_search_rejects_bad_cursor(client, fake_db):
+    response = client.get("/search/messages", params={"query": "paracetamol", "cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["0.4", "2025-01-10T09:00:00+00:00", "CheMed123", 1],
+        [True, "2025-01-10T09:00:00+00:00", "CheMed123", 1],
+        [0.4, "2025-01-10T09:00:00+00:00", 7, 1],
+        [0.4, "2025-01-10T09:00:00+00:00", "CheMed123", "1"],
+        [0.4, "2025-01-10T09:00:00+00:00", "CheMed123", 1.5],
+        [0.4, "2025-01-10T09:00:00+00:00", "CheMed123", False],
+    ],
+)
+def test_search_rejects_cursor_values_of_the_wrong_type(client, fake_db, values):
+    response = client.get("/search/messages", params={"query": "paracetamol", "cursor": encode_cursor(values)})
+
+    assert response.status_code == 400
+    assert not fake_db.statements
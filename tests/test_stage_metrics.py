@@ -0,0 +1,12 @@
+from dagster_project import locks, stage_metrics
+
+
+def test_stage_metrics_engine_uses_psycopg3(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@db:5432/mw")
+    monkeypatch.setattr(stage_metrics, "_engine", None)
+
+    engine = stage_metrics.get_engine()
+
+    assert engine.dialect.driver == "psycopg"
+    # Advisory locks share the engine, so they get the same driver.
+    assert locks.get_engine() is engine
@@ -0,0 +1,131 @@
+import csv
+import hashlib
+
+import pytest
+
+from src import yolo_detect
+
+MODEL_VERSION = "yolov8n.pt@test"
+
+
+@pytest.fixture
+def img_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(yolo_detect, "IMG_DIR", tmp_path / "images")
+    return tmp_path / "images"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = yolo_detect.open_cache(tmp_path / "cache.sqlite")
+    yield cache
+    cache.close()
+
+
+def write_image(img_dir, channel, message_id, content=b"jpeg-bytes"):
+    path = img_dir / channel / f"{message_id}.jpg"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def cache_detection(cache, image_hash, model_version=MODEL_VERSION):
+    cache.execute(
+        "INSERT INTO detections (image_hash, model_version, category, max_confidence, detections, processed_at) "
+        "VALUES (?, ?, 'product_display', 0.9, 'bottle(0.90)', '2025-01-10T09:00:00')",
+        (image_hash, model_version),
+    )
+
+
+def sha256(content=b"jpeg-bytes"):
+    return hashlib.sha256(content).hexdigest()
+
+
+def test_plan_images_runs_new_images(img_dir, cache):
+    path = write_image(img_dir, "CheMed123", 1)
+
+    to_run, reused = yolo_detect.plan_images(cache, MODEL_VERSION)
+
+    assert to_run == [(path, sha256())]
+    assert reused == []
+
+
+def test_plan_images_reuses_detections_for_known_content(img_dir, cache):
+    cache_detection(cache, sha256())
+    path = write_image(img_dir, "lobelia4cosmetics", 7)
+
+    to_run, reused = yolo_detect.plan_images(cache, MODEL_VERSION)
+
+    assert to_run == []
+    assert [(r["image_path"], r["channel_name"], r["message_id"], r["category"]) for r in reused] == [
+        (str(path), "lobelia4cosmetics", "7", "product_display")
+    ]
+    # The path is indexed now, so the next plan skips it without hashing or emitting it again.
+    assert yolo_detect.plan_images(cache, MODEL_VERSION) == ([], [])
+
+
+def test_plan_images_reruns_for_a_new_model_version_or_force(img_dir, cache):
+    path = write_image(img_dir, "CheMed123", 1)
+    cache_detection(cache, sha256())
+    yolo_detect.plan_images(cache, MODEL_VERSION)
+
+    assert yolo_detect.plan_images(cache, "yolov8s.pt@test") == ([(path, sha256())], [])
+    assert yolo_detect.plan_images(cache, MODEL_VERSION, force=True) == ([(path, sha256())], [])
+
+
+def test_plan_images_rehashes_changed_files(img_dir, cache):
+    path = write_image(img_dir, "CheMed123", 1)
+    cache_detection(cache, sha256())
+    yolo_detect.plan_images(cache, MODEL_VERSION)
+
+    write_image(img_dir, "CheMed123", 1, content=b"a different photo")
+
+    assert yolo_detect.plan_images(cache, MODEL_VERSION) == ([(path, sha256(b"a different photo"))], [])
+
+
+def detection_row(message_id):
+    return {
+        "image_path": f"data/raw/images/CheMed123/{message_id}.jpg",
+        "channel_name": "CheMed123",
+        "message_id": str(message_id),
+        "category": "product_display",
+        "max_confidence": 0.9,
+        "detections": "bottle(0.90)",
+        "processed_at": "2025-01-10T09:00:00",
+        "image_hash": sha256(),
+        "model_version": MODEL_VERSION,
+    }
+
+
+def read_csv(path):
+    with path.open(encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_csv_outbox_appends_batches_under_one_header(tmp_path):
+    path = tmp_path / "yolo_detections.csv"
+
+    outbox = yolo_detect.CsvOutbox(path)
+    outbox.write([detection_row(1)])
+    outbox.close()
+    # A later run (e.g. after a failed load) keeps appending to the pending outbox.
+    outbox = yolo_detect.CsvOutbox(path)
+    outbox.write([detection_row(2), detection_row(3)])
+    outbox.close()
+
+    rows = read_csv(path)
+    assert rows[0] == yolo_detect.OUTPUT_COLUMNS
+    assert [r[2] for r in rows[1:]] == ["1", "2", "3"]
+    assert outbox.rows == 2
+
+
+def test_csv_outbox_moves_old_layout_aside(tmp_path):
+    path = tmp_path / "yolo_detections.csv"
+    path.write_text("image_path,channel_name,message_id,category\nold.jpg,CheMed123,1,other\n", encoding="utf-8")
+
+    outbox = yolo_detect.CsvOutbox(path)
+    outbox.write([detection_row(2)])
+    outbox.close()
+
+    assert read_csv(path)[0] == yolo_detect.OUTPUT_COLUMNS
+    assert len(read_csv(path)) == 2
+    assert read_csv(tmp_path / "yolo_detections.legacy.csv")[1] == ["old.jpg", "CheMed123", "1", "other"]